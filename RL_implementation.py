@@ -1,19 +1,58 @@
+import argparse
 import random
 import time
 import sys
 import os
-import numpy as np
 import cv2
-from PIL import ImageGrab, Image
 import tkinter as tk
-from datetime import datetime
 import pyautogui
 import keyboard
 # Import only the gui module - we'll implement player_view functionality inline
 import gui
+from engine import WON, LOST, FLAGGED
+from solver import ConstraintSolver
+import board_vision
+import color_lut
+from board_vision import classify_cells, board_to_strings, IncrementalBoardReader
+from click_executor import ClickExecutor
+from geometry_cache import GridGeometryCache
+from capture import TkWindowCapture, BoardCapture
+from instrumentation import recorder, DETECTION, CLASSIFICATION, DECISION, CLICK, UI_WAIT
+from replay import ReplayLog
+from experience import ReplayBuffer
+from pattern_agent import PatternAgent
+from vec_env import REWARD_WIN, REWARD_LOSS, REWARD_PROGRESS
+from debug_sink import DebugImageSink, MODES, FRAME, GAME_END_EVENT, ERROR_EVENT
 
-def run_minesweeper_bot():
-    """Run a bot that plays Minesweeper by combining GUI, visual analysis and random clicking"""
+def run_minesweeper_bot(debug_mode="all", debug_every_n=10, capture_backend=None, max_games=None,
+                        metrics_path=None, metrics_port=None, seed=None, replay_log_path=None,
+                        experience_dir=None, experience_capacity=1_000_000, agent_path=None):
+    """Run a bot that plays Minesweeper by combining GUI, visual analysis and random clicking
+
+    capture_backend defaults to a PyAutoGUI screenshot of the current game window.
+    With max_games set the bot stops after that many games and returns its stats.
+    Per-stage latency percentiles are written to metrics_path on exit and, if
+    metrics_port is set, served as text on that local port while running.
+    Game seeds and solver guesses derive from `seed`; with replay_log_path
+    set every game is appended to that replay log. With experience_dir set
+    every click is stored as a transition in a memory-mapped ReplayBuffer.
+    With agent_path set, guesses come from a trained PatternAgent instead of
+    the solver's probability estimate.
+    """
+    color_lut.load_or_calibrate()
+    rng = random.Random(seed)
+    replay_log = ReplayLog(replay_log_path) if replay_log_path else None
+    experience = None
+    pattern_agent = None
+    if agent_path:
+        pattern_agent = PatternAgent.load(agent_path, gui.rows, gui.cols, gui.num_bombs,
+                                          seed=rng.getrandbits(64))
+    if experience_dir:
+        experience = ReplayBuffer(experience_capacity, (gui.rows, gui.cols), directory=experience_dir)
+    if metrics_path:
+        recorder.dump_on_exit(metrics_path)
+    if metrics_port:
+        recorder.serve(metrics_port)
     
     # Create debug directory if it doesn't exist
     debug_dir = "debug_screenshots"
@@ -30,144 +69,49 @@ def run_minesweeper_bot():
         os.makedirs(debug_dir)
     
     # Statistics tracking
-    stats = {"games": 0, "wins": 0, "losses": 0}
+    stats = {"games": 0, "wins": 0, "losses": 0, "moves": 0}
     scheduled_afters = []  # Track scheduled callbacks
     board_state = None  # Store the current board state
-    cell_contours = None
     organized_cells = None
+    executor = None  # Batched clicks verified by one capture, once the grid is known
+    solver = ConstraintSolver(gui.rows, gui.cols, gui.num_bombs, seed=rng.getrandbits(64))
+    geometry_cache = GridGeometryCache()  # Organized cells reused across games
+    # Debug images are encoded and written on a background thread
+    debug_sink = DebugImageSink(debug_dir, mode=debug_mode, every_n=debug_every_n)
 
-    def save_debug_screenshot(img, name_prefix):
-        """Save a screenshot with timestamp for debugging"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{debug_dir}/{name_prefix}_{stats['games']}_{timestamp}.png"
-        cv2.imwrite(filename, img)
-        print(f"Saved debug screenshot: {filename}")
-        return filename
+    def save_debug_screenshot(img, name_prefix, event=FRAME):
+        """Queue a screenshot for writing, subject to the debug sampling mode"""
+        return debug_sink.save(img, f"{name_prefix}_{stats['games']}", event)
     
+    def window_rect():
+        """Position and size of the game window on screen"""
+        return root.winfo_rootx(), root.winfo_rooty(), root.winfo_width(), root.winfo_height()
+
     def capture_screenshot():
-        """Capture a screenshot of the game window using PyAutoGUI"""
-        # Force window update and focus
-        root.update_idletasks()
-        root.update()
-        root.focus_force()
-        root.lift()
-        
-        # Small delay to ensure window is rendered
-        time.sleep(0.1)
-        
-        # Get window position and dimensions
-        x, y = root.winfo_rootx(), root.winfo_rooty() 
-        width, height = root.winfo_width(), root.winfo_height()
-        
-        print(f"Window position: ({x},{y}), size: ({width}x{height})")
-        
-        # Verify coordinates are valid
-        if width <= 10 or height <= 10 or x < 0 or y < 0:
-            print(f"Invalid window dimensions")
-            return None
-        
-        # Use PyAutoGUI to capture screenshot of the region
+        """Capture a screenshot of the game window through the capture backend"""
+        backend = capture_backend or TkWindowCapture(root)
         try:
-            screenshot = pyautogui.screenshot(region=(x, y, width, height))
-            # Convert PIL image to numpy array for OpenCV
-            screenshot = np.array(screenshot)
-            screenshot = cv2.cvtColor(screenshot, cv2.COLOR_RGB2BGR)
+            screenshot, (x, y, width, height) = backend.grab()
+            print(f"Window position: ({x},{y}), size: ({width}x{height})")
+            if screenshot is None:
+                return None
             save_debug_screenshot(screenshot, "pyautogui_screenshot")
             return screenshot
         except Exception as e:
-            print(f"Error capturing screenshot with PyAutoGUI: {e}")
+            print(f"Error capturing screenshot: {e}")
             return None
-    
-    def detect_grid_cells(image):
-        """Detect individual cells using contrast detection (from player_view)"""
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Apply adaptive thresholding to handle different lighting conditions
-        thresh = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY_INV, 11, 2
-        )
-        # Inflate the edges to make them more pronounced
-        kernel = np.ones((3, 3), np.uint8)
-        thresh = cv2.dilate(thresh, kernel, iterations=2)
-        save_debug_screenshot(thresh, "threshold_debug")
 
-        # Find contours of all cells
-        contours, _ = cv2.findContours(thresh, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Filter contours to find cells (looking for squares of similar size)
-        cell_contours = []
-        areas = []
-        
-        for cnt in contours:
-            x, y, w, h = cv2.boundingRect(cnt)
-            # Filter by aspect ratio (cells should be roughly square)
-            aspect_ratio = float(w) / h
-            if 0.5 <= aspect_ratio <= 1.2:
-                # Filter by size (cells should be reasonably sized)
-                if 20 <= w <= 100 and 20 <= h <= 100:
-                    cell_contours.append((x, y, w, h))
-                    areas.append(w * h)
-        
-        # If we found cells, filter by area to remove outliers
-        if areas:
-            # Sort areas and get median
-            areas.sort()
-            median_area = areas[len(areas) // 2]
-            
-            # Keep only cells with area close to median
-            filtered_contours = []
-            for contour in cell_contours:
-                x, y, w, h = contour
-                area = w * h
-                # Accept cells within 50% of median area
-                if 0.5 * median_area <= area <= 1.5 * median_area:
-                    filtered_contours.append(contour)
-            
-            cell_contours = filtered_contours
-        
-        # Visualization for debugging
-        debug_image = image.copy()
-        for x, y, w, h in cell_contours:
-            cv2.rectangle(debug_image, (x, y), (x + w, y + h), (0, 255, 0), 2)
-        
-        save_debug_screenshot(debug_image, "detected_cells")
-        print(f"Detected {len(cell_contours)} potential cells")
-        
-        return cell_contours
-    
-    def organize_cells_into_grid(cell_contours):
-        """Organize detected cells into a grid structure (from player_view)"""
-        if not cell_contours:
+    def capture_board(board_capture):
+        """Capture only the board into the reused mosaic of cell-centre patches"""
+        try:
+            mosaic, _ = board_capture.grab()
+            if mosaic is not None:
+                save_debug_screenshot(mosaic, "board_capture")
+            return mosaic
+        except Exception as e:
+            print(f"Error capturing board: {e}")
             return None
-            
-        # Sort cells by y-coordinate (row) first
-        cell_contours.sort(key=lambda c: c[1])
-        
-        # Identify rows by grouping cells with similar y-coordinates
-        rows = []
-        current_row = [cell_contours[0]]
-        row_height = cell_contours[0][3]  # Height of first cell
-        
-        for cell in cell_contours[1:]:
-            # If this cell is significantly below the previous row, start a new row
-            if abs(cell[1] - current_row[0][1]) > row_height * 0.5:
-                rows.append(current_row)
-                current_row = [cell]
-            else:
-                current_row.append(cell)
-        
-        # Add the last row
-        if current_row:
-            rows.append(current_row)
-        
-        # Sort each row by x-coordinate
-        for i in range(len(rows)):
-            rows[i].sort(key=lambda c: c[0])
-        
-        return rows
-
+    
     def create_grid_visualization(image, organized_cells):
         """Create a visualization of the detected grid"""
         if organized_cells is None:
@@ -189,9 +133,28 @@ def run_minesweeper_bot():
         
         return viz_image
     
+    def detect_and_organize_grid(screenshot):
+        """Find the board's cells in a screenshot and organize them into rows"""
+        save_debug_screenshot(screenshot, "initial_game")
+        try:
+            grid = board_vision.detect_grid(
+                screenshot, row_tolerance=0.5, aspect_range=(0.5, 1.2), min_size=20, max_size=100,
+                area_tolerance=0.5, on_debug_image=save_debug_screenshot if debug_sink.wants(FRAME) else None
+            )
+        except Exception as e:
+            print(f"Error organizing cells into grid: {e}")
+            return None
+        if not grid:
+            return None
+        
+        print(f"Organized cells into a grid with {len(grid)} rows")
+        if debug_sink.wants(FRAME):
+            save_debug_screenshot(create_grid_visualization(screenshot, grid), "grid_visualization")
+        return grid
+    
     def start_new_game():
         """Start or restart a game"""
-        nonlocal root, buttons, cell_contours, organized_cells
+        nonlocal game, root, buttons, organized_cells, executor, board_state
 
         # Cancel any pending callbacks
         for after_id in scheduled_afters:
@@ -203,13 +166,18 @@ def run_minesweeper_bot():
         scheduled_afters.clear()
         
         # Clean up previous game if it exists
-        if 'root' in locals() and root:
-            root.destroy()
+        if game is not None:
+            game.close()
         
         # Create a new game
-        root = gui.create_game()
-        buttons = gui.buttons
+        game = gui.MinesweeperGame(gui.rows, gui.cols, gui.num_bombs, seed=rng.getrandbits(64), log=replay_log)
+        print(f"Game seed: {game.engine.seed}")
+        root, buttons = game.root, game.buttons
+        solver.reset()
+        if pattern_agent is not None:
+            pattern_agent.reset()
         stats["games"] += 1
+        recorder.start_game(stats["games"])
         print(f"\nStarting game #{stats['games']}...")
         
         # Ensure window is properly initialized and visible
@@ -218,40 +186,34 @@ def run_minesweeper_bot():
         root.focus_force()
         root.lift()
         
-        # Add significant delay to ensure UI is fully rendered
-        time.sleep(0.5)
+        # Add significant delay to ensure UI is fully rendered. Once the grid
+        # geometry is cached the capture's own short settle delay is enough.
+        if not geometry_cache.has_entry():
+            time.sleep(0.5)
         
         # Initialize board analysis
         try:
             # Capture screenshot
             screenshot = capture_screenshot()
             if screenshot is not None:
-                save_debug_screenshot(screenshot, "initial_game")
-                
-                # Detect cells
-                print("Detecting cells...")
-                cell_contours = detect_grid_cells(screenshot)
-                
-                # Create a visualization of detected cells
-                if cell_contours and len(cell_contours) > 0:
-                    cells_viz = screenshot.copy()
-                    for x, y, w, h in cell_contours:
-                        cv2.rectangle(cells_viz, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                    save_debug_screenshot(cells_viz, "detected_cells")
-                    
-                    # Try to organize cells into a grid
-                    try:
-                        organized_cells = organize_cells_into_grid(cell_contours)
-                        
-                        # Create visualization
-                        grid_viz = create_grid_visualization(screenshot, organized_cells)
-                        save_debug_screenshot(grid_viz, "grid_visualization")
-                        
-                        print(f"Successfully organized cells into a grid with {len(organized_cells)} rows")
-                        for i, row in enumerate(organized_cells):
-                            print(f"Row {i}: {len(row)} cells")
-                    except Exception as e:
-                        print(f"Error organizing cells into grid: {e}")
+                board_dims = (len(buttons), len(buttons[0]))
+                organized_cells = geometry_cache.lookup(window_rect(), board_dims, screenshot)
+                if organized_cells is not None:
+                    print(f"Reusing cached grid geometry with {len(organized_cells)} rows")
+                else:
+                    with recorder.stage(DETECTION):
+                        organized_cells = detect_and_organize_grid(screenshot)
+                    # Only cache a grid that covers the whole board
+                    if organized_cells is not None and len(organized_cells) == board_dims[0] \
+                            and all(len(row) == board_dims[1] for row in organized_cells):
+                        geometry_cache.store(window_rect(), board_dims, screenshot, organized_cells)
+            executor = None
+            if screenshot is not None and organized_cells is not None:
+                # From here on only the board is captured, as a mosaic of cell centres
+                board_capture = BoardCapture(capture_backend or TkWindowCapture(root), organized_cells)
+                executor = ClickExecutor(click_cell, lambda: capture_board(board_capture),
+                                         IncrementalBoardReader(board_capture.cells))
+                board_state = executor.prime(board_capture.load(screenshot))
             
             # Schedule the bot to start playing after a delay
             after_id = root.after(100, start_playing)
@@ -274,6 +236,7 @@ def run_minesweeper_bot():
             sys.exit()
     
     def click_cell_with_pyautogui(row, col):
+        """Click a cell's button on screen; the capture that follows a batch does the waiting"""
         try:
             # Get button's position
             button = buttons[row][col]
@@ -284,126 +247,188 @@ def run_minesweeper_bot():
             print(f"PyAutoGUI clicking at position ({x}, {y})")
             
             # Move mouse to position and click
-            pyautogui.click(x, y)
-            
-            # Small delay to allow game to process the click
-            time.sleep(0.1)
+            pyautogui.click(x, y, _pause=False)
             return True
         except Exception as e:
             print(f"Error clicking with PyAutoGUI: {e}")
             return False
+
+    def click_cell(row, col):
+        if not click_cell_with_pyautogui(row, col):
+            print("Falling back to Tkinter invoke method")
+            buttons[row][col].invoke()
     
     def analyze_cell_numbers(image, organized_cells):
-        """Extract the number from each cell using color analysis (like player_view)"""
-        board = []
-        # Color ranges for different numbers (BGR format)
-        color_ranges = {
-            '1': {'lower': (220, 0, 0), 'upper': (255, 100, 100)},     # Blue
-            '2': {'lower': (50, 100, 0), 'upper': (150, 255, 200)},     # Green
-            '3': {'lower': (50, 100, 100), 'upper': (100, 150, 255)},   # Red
-            '4': {'lower': (128, 0, 128), 'upper': (255, 100, 255)},    # Purple
-            '5': {'lower': (0, 0, 128), 'upper': (100, 100, 180)},      # Dark Red
-            '6': {'lower': (128, 128, 0), 'upper': (255, 255, 100)},    # Turquoise
-            '7': {'lower': (0, 0, 0), 'upper': (50, 50, 50)},           # Black
-            '8': {'lower': (100, 100, 100), 'upper': (150, 150, 150)}   # Gray
-        }
-        for row in organized_cells:
-            board_row = []
-            for x, y, w, h in row:
-                center_x, center_y = x + w//2, y + h//2
-                cell_region = image[center_y-5:center_y+5, center_x-5:center_x+5]
-                if cell_region.size == 0:
-                    board_row.append("?")
-                    continue
-                avg_color = np.mean(cell_region, axis=(0, 1))
-                if np.mean(avg_color) > 200:  # Light background = unrevealed
-                    board_row.append(" ")
-                    continue
-                number = " "
-                for digit, range_data in color_ranges.items():
-                    lower = np.array(range_data['lower'])
-                    upper = np.array(range_data['upper'])
-                    # Check if any pixel in the region matches the color range
-                    mask = cv2.inRange(cell_region, lower, upper)
-                    if np.any(mask):
-                        number = digit
-                        break
-                board_row.append(number)
-            board.append(board_row)
-        return board
+        """Classify every cell from its centre colour, returning a uint8 board of codes"""
+        with recorder.stage(CLASSIFICATION):
+            return classify_cells(image, organized_cells)
 
     def print_board(board):
         """Print the board state in a readable format"""
-        for row in board:
+        for row in board_to_strings(board):
             print(" ".join(row))
 
+    def update_solver(board_state):
+        """Feed the analyzed board into the solver if it matches the game grid"""
+        if board_state is None:
+            return
+        if board_state.shape != solver.board.shape:
+            print(f"Board shape {board_state.shape} does not match the game grid, skipping solver update")
+            return
+        board = board_state.copy()
+        # Revealed empty cells look unrevealed on screen; the game state knows better
+        engine = game.engine
+        board[engine.revealed & (engine.counts == 0)] = 0
+        solver.update(board)
+
+    def record_transitions(obs, batch):
+        """Store one transition per clicked cell.
+
+        A batch is verified with one capture, so its clicks share the
+        observations from before and after the batch.
+        """
+        engine = game.engine
+        next_obs = engine.observation()
+        reward = {WON: REWARD_WIN, LOST: REWARD_LOSS}.get(engine.status, REWARD_PROGRESS)
+        for r, c in batch:
+            experience.add(obs, r * engine.cols + c, reward, next_obs, engine.game_over)
+
     def make_random_moves(num_moves=20, delay=0.2):
-        rows = len(buttons)
-        cols = len(buttons[0])
         nonlocal board_state
 
         for move_num in range(num_moves):
-            # Pick a random cell
-            r = random.randint(0, rows-1)
-            c = random.randint(0, cols-1)
-            # Skip cells that are already revealed
-            if buttons[r][c]['relief'] == 'sunken':
+            # Click every cell the solver knows is safe at once, guessing a
+            # single cell only when nothing is certain
+            with recorder.stage(DECISION):
+                batch = [cell for cell in solver.safe_moves() if not game.engine.revealed[cell]]
+                certain = True
+                if not batch:
+                    if pattern_agent is not None:
+                        # Known mines are passed as flags so the agent avoids them
+                        board = solver.board.copy()
+                        for cell in solver.mines:
+                            board[cell] = FLAGGED
+                        pattern_agent.sync(board)
+                        r, c, _ = pattern_agent.choose(gui.num_bombs - len(solver.mines))
+                        certain = False
+                    else:
+                        r, c, certain = solver.next_move()
+                    if not game.engine.revealed[r, c]:
+                        batch = [(r, c)]
+            # Nothing left to click until the solver catches up with the board
+            if not batch:
+                update_solver(board_state)
                 continue
 
-            print(f"Left clicking cell at ({r}, {c})")
-            click_success = click_cell_with_pyautogui(r, c)
-            if not click_success:
-                print("Falling back to Tkinter invoke method")
-                buttons[r][c].invoke()
+            print(f"Left clicking {len(batch)} cell(s): {batch}{'' if certain else ' (guess)'}")
+            stats["moves"] += len(batch)
+            obs = game.engine.observation() if experience is not None else None
 
-            # After each move, capture and analyze the board state
+            # Capture and verify the board once for the whole batch
             try:
-                screenshot = capture_screenshot()
-                if screenshot is not None and organized_cells is not None:
-                    board_state = analyze_cell_numbers(screenshot, organized_cells)
+                if executor is not None:
+                    board_state, missed = executor.execute(batch)
+                    if missed:
+                        print(f"Clicks did not register: {missed}")
+                else:
+                    for r, c in batch:
+                        with recorder.stage(CLICK):
+                            click_cell(r, c)
+                    screenshot = capture_screenshot()
+                    if screenshot is not None and organized_cells is not None:
+                        board_state = analyze_cell_numbers(screenshot, organized_cells)
+                if board_state is not None:
                     print("Current board state:")
                     print_board(board_state)
+                    with recorder.stage(DECISION):
+                        update_solver(board_state)
             except Exception as e:
                 print(f"Error analyzing board state: {e}")
+                if debug_sink.wants(ERROR_EVENT):
+                    save_debug_screenshot(capture_screenshot(), "analysis_error", ERROR_EVENT)
 
-            root.update()
-            if "Win" in gui.label['text'] or "Over" in gui.label['text']:
-                if "Win" in gui.label['text']:
+            with recorder.stage(UI_WAIT):
+                root.update()
+            if experience is not None:
+                record_transitions(obs, batch)
+            if game.engine.game_over:
+                if game.engine.status == WON:
                     stats["wins"] += 1
                 else:
                     stats["losses"] += 1
                 
-                # Capture final state
-                try:
-                    final_screenshot = capture_screenshot()
-                    if final_screenshot is not None:
-                        save_debug_screenshot(final_screenshot, "game_end")
-                except Exception as e:
-                    print(f"Error capturing final state: {e}")
+                # Capture final state, only when the debug mode keeps it
+                if debug_sink.wants(GAME_END_EVENT):
+                    try:
+                        final_screenshot = capture_screenshot()
+                        if final_screenshot is not None:
+                            save_debug_screenshot(final_screenshot, "game_end", GAME_END_EVENT)
+                    except Exception as e:
+                        print(f"Error capturing final state: {e}")
                 
-                print(f"Game ended: {gui.label['text']}")
+                print(f"Game ended: {gui.STATUS_TEXT[game.engine.status]}")
                 print(f"Stats: Games={stats['games']}, Wins={stats['wins']}, Losses={stats['losses']}")
                 
+                if max_games is not None and stats["games"] >= max_games:
+                    root.destroy()
+                    return
+                
                 # Schedule a new game to start after a short delay
                 after_id = root.after(100, start_new_game)
                 scheduled_afters.append(after_id)
                 return
                 
-            root.update()
-            time.sleep(delay)
+            with recorder.stage(UI_WAIT):
+                root.update()
+                time.sleep(delay)
         
         # If we run out of moves but game isn't over, continue with more moves
         after_id = root.after(500, lambda: make_random_moves(20, delay))
         scheduled_afters.append(after_id)
     
     # Create the first game
+    game = None
     root = None
     buttons = None
     root = start_new_game()
     
     # Start the game mainloop
-    root.mainloop()
+    start_time = time.perf_counter()
+    try:
+        root.mainloop()
+    finally:
+        debug_sink.close()
+        if replay_log is not None:
+            replay_log.close()
+        if experience is not None:
+            experience.flush()
+        print(recorder.format_text())
+    stats["elapsed"] = time.perf_counter() - start_time
+    return stats
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Minesweeper from screen captures")
+    parser.add_argument("--debug-mode", choices=MODES, default="all",
+                        help="Which debug screenshots to write")
+    parser.add_argument("--debug-every", type=int, default=10,
+                        help="Sampling interval for --debug-mode every_n")
+    parser.add_argument("--metrics-path", default="latency_metrics.json",
+                        help="Where to write per-stage latency percentiles on exit")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve live latency percentiles on this local port")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible games")
+    parser.add_argument("--replay-log", default=None, help="Append every game to this replay log")
+    parser.add_argument("--experience-dir", default=None,
+                        help="Store click transitions in a memory-mapped replay buffer here")
+    parser.add_argument("--experience-capacity", type=int, default=1_000_000,
+                        help="Transitions kept in the replay buffer")
+    parser.add_argument("--agent", default=None,
+                        help="Pattern table from pattern_agent.py to make guesses with")
+    args = parser.parse_args()
+
     # Launch the bot with its own game instance
-    run_minesweeper_bot()
\ No newline at end of file
+    run_minesweeper_bot(debug_mode=args.debug_mode, debug_every_n=args.debug_every,
+                        metrics_path=args.metrics_path, metrics_port=args.metrics_port,
+                        seed=args.seed, replay_log_path=args.replay_log,
+                        experience_dir=args.experience_dir, experience_capacity=args.experience_capacity,
+                        agent_path=args.agent)
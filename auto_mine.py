@@ -1,26 +1,76 @@
+import argparse
 import random
 import time
-import sys
+from engine import MinesweeperEngine, WON
+from solver import ConstraintSolver
+from replay import ReplayLog
 
-def run_minesweeper_bot():
-    """Run a bot that directly controls the Minesweeper game"""
+def run_headless_bot(num_games=1000, rows=10, cols=10, num_bombs=15, seed=None, log_path=None):
+    """Play solver-driven games directly against the engine, without any window.
+
+    Game seeds and solver guesses all derive from `seed`, so a run can be
+    repeated exactly. With log_path set every game is appended to that
+    replay log.
+    """
+    stats = {"games": 0, "wins": 0, "losses": 0}
+    rng = random.Random(seed)
+    log = ReplayLog(log_path) if log_path else None
+    engine = MinesweeperEngine(rows, cols, num_bombs, seed=rng.getrandbits(64), log=log)
+    solver = ConstraintSolver(rows, cols, num_bombs, seed=rng.getrandbits(64))
+    start = time.perf_counter()
+
+    for game in range(num_games):
+        if game:
+            engine.reset(seed=rng.getrandbits(64))
+        solver.reset()
+        stats["games"] += 1
+        while not engine.game_over:
+            r, c, _certain = solver.next_move()
+            newly_revealed = engine.reveal(r, c)
+            solver.update(engine.observation(), changed=[tuple(cell) for cell in newly_revealed.tolist()])
+
+        if engine.status == WON:
+            stats["wins"] += 1
+        else:
+            stats["losses"] += 1
+
+    elapsed = time.perf_counter() - start
+    if log is not None:
+        log.close()
+        print(f"Recorded {log.games} games to {log_path}")
+    print(f"Stats: Games={stats['games']}, Wins={stats['wins']}, Losses={stats['losses']}")
+    print(f"Played {stats['games']} games in {elapsed:.2f}s ({stats['games'] / elapsed:.0f} games/s)")
+    return stats
+
+def run_minesweeper_bot(seed=None, log_path=None):
+    """Run a bot that directly controls the Minesweeper game
+
+    Game seeds and solver guesses derive from `seed`, as in
+    run_headless_bot(); with log_path set every game is appended to that
+    replay log.
+    """
     # Import the game module but don't run it yet
     import gui
     
     # Statistics tracking
     stats = {"games": 0, "wins": 0, "losses": 0}
+    rng = random.Random(seed)
+    log = ReplayLog(log_path) if log_path else None
+    solver = ConstraintSolver(gui.rows, gui.cols, gui.num_bombs, seed=rng.getrandbits(64))
     
     def start_new_game():
         """Start or restart a game"""
-        nonlocal root, buttons
+        nonlocal root, game
         
         # Clean up previous game if it exists
-        if 'root' in locals() and root:
-            root.destroy()
+        if game is not None:
+            game.close()
             
         # Create a new game
-        root = gui.create_game()
-        buttons = gui.buttons
+        game = gui.MinesweeperGame(gui.rows, gui.cols, gui.num_bombs, seed=rng.getrandbits(64), log=log)
+        print(f"Game seed: {game.engine.seed}")
+        root = game.root
+        solver.reset()
         stats["games"] += 1
         print(f"\nStarting game #{stats['games']}...")
         
@@ -29,29 +79,22 @@ def run_minesweeper_bot():
         return root
     
     def make_random_moves(num_moves=50, delay=0.01):
-        rows = len(buttons)
-        cols = len(buttons[0])
-        
         for _ in range(num_moves):
-            # Pick a random cell
-            r = random.randint(0, rows-1)
-            c = random.randint(0, cols-1)
-            
-            # Skip cells that are already revealed
-            if buttons[r][c]['relief'] == 'sunken':
-                continue
+            # Let the solver pick a cell, guessing only when nothing is certain
+            r, c, certain = solver.next_move()
 
-            print(f"Left clicking cell at ({r}, {c})")
-            buttons[r][c].invoke()  # Simulate left click
+            print(f"Left clicking cell at ({r}, {c}){'' if certain else ' (guess)'}")
+            game.buttons[r][c].invoke()  # Simulate left click
+            solver.update(game.engine.observation())
            
             # Check if game is over
-            if "Win" in gui.label['text'] or "Over" in gui.label['text']:
-                if "Win" in gui.label['text']:
+            if game.engine.game_over:
+                if game.engine.status == WON:
                     stats["wins"] += 1
                 else:
                     stats["losses"] += 1
                 
-                print(f"Game ended: {gui.label['text']}")
+                print(f"Game ended: {gui.STATUS_TEXT[game.engine.status]}")
                 print(f"Stats: Games={stats['games']}, Wins={stats['wins']}, Losses={stats['losses']}")
                 
                 # Schedule a new game to start after a short delay
@@ -67,12 +110,28 @@ def run_minesweeper_bot():
     
     # Create the first game
     root = None
-    buttons = None
+    game = None
     root = start_new_game()
     
     # Start the game mainloop
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        if log is not None:
+            log.close()
+            print(f"Recorded {log.games} games to {log_path}")
 
 if __name__ == "__main__":
-    # Launch the bot with its own game instance
-    run_minesweeper_bot()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Let the solver play Minesweeper")
+    parser.add_argument("--headless", action="store_true", help="Simulate games without opening a window")
+    parser.add_argument("--games", type=int, default=1000, help="Games to play headless")
+    parser.add_argument("--seed", type=int, help="Seed for a reproducible run")
+    parser.add_argument("--replay-log", help="Append every game to this replay log")
+    args = parser.parse_args()
+
+    if args.headless:
+        # Simulate games without opening a window
+        run_headless_bot(args.games, seed=args.seed, log_path=args.replay_log)
+    else:
+        # Launch the bot with its own game instance
+        run_minesweeper_bot(seed=args.seed, log_path=args.replay_log)
@@ -0,0 +1,297 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+import board_vision
+import color_lut
+from capture import BoardCapture, VirtualFrameRenderer
+from engine import MinesweeperEngine
+from layouts import OPENING, bombs_for_density, generate_layouts
+from vec_env import BatchedMinesweeperEnv
+
+CORPUS_DIR = "bench_corpus"
+# (rows, cols, bombs) for the stored screenshot corpus
+CORPUS_SIZES = [(9, 9, 10), (10, 10, 15), (16, 16, 40), (16, 30, 99)]
+FRAMES_PER_SIZE = 8
+
+# Results where higher is better; everything else is a latency
+THROUGHPUT_KEYS = ("games_per_sec", "moves_per_sec", "steps_per_sec", "layouts_per_sec")
+
+
+def summarize(samples):
+    """Mean and percentiles of a list of timings in milliseconds"""
+    samples = np.asarray(samples) * 1000
+    return {
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "samples": int(samples.size),
+    }
+
+
+def bench_engine_random(games, rows=10, cols=10, num_bombs=15):
+    """Random-click games against the engine, i.e. the rules behind gui.on_click"""
+    rng = random.Random(0)
+    engine = MinesweeperEngine(rows, cols, num_bombs, seed=0)
+    moves = 0
+    start = time.perf_counter()
+    for _ in range(games):
+        engine.reset(seed=rng.getrandbits(64))
+        while not engine.game_over:
+            hidden = np.flatnonzero(~engine.revealed)
+            engine.reveal(*divmod(int(hidden[rng.randrange(len(hidden))]), cols))
+            moves += 1
+    elapsed = time.perf_counter() - start
+    return {"games": games, "games_per_sec": games / elapsed, "moves_per_sec": moves / elapsed}
+
+
+def bench_auto_mine(games):
+    """Solver-driven headless games through auto_mine.run_headless_bot"""
+    import auto_mine
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = auto_mine.run_headless_bot(num_games=games)
+    elapsed = time.perf_counter() - start
+    return {"games": games, "games_per_sec": games / elapsed, "win_rate": stats["wins"] / games}
+
+
+def bench_guesses(games=50, rows=16, cols=30, num_bombs=99):
+    """Latency of the solver's probability engine whenever it has to guess"""
+    from solver import ConstraintSolver
+
+    latencies = []
+    enumerated = 0
+    for seed in range(games):
+        engine = MinesweeperEngine(rows, cols, num_bombs, seed=seed)
+        solver = ConstraintSolver(rows, cols, num_bombs, seed=seed)
+        while not engine.game_over:
+            if not solver.safe:
+                start = time.perf_counter()
+                solver.mine_probabilities()
+                latencies.append(time.perf_counter() - start)
+            r, c, _certain = solver.next_move()
+            engine.reveal(r, c)
+            solver.update(engine.observation())
+        enumerated += solver.frontier.enumerated
+    latencies = np.array(latencies) * 1000
+    return {"guesses": len(latencies), "median_ms": float(np.median(latencies)),
+            "p99_ms": float(np.percentile(latencies, 99)), "components_enumerated": enumerated}
+
+
+def bench_vec_env(num_envs=256, steps=200, rows=16, cols=30, num_bombs=99):
+    """Random actions on the batched environment"""
+    env = BatchedMinesweeperEnv(num_envs, rows, cols, num_bombs, seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, rows * cols, (steps, num_envs))
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    elapsed = time.perf_counter() - start
+    return {"num_envs": num_envs, "steps_per_sec": num_envs * steps / elapsed}
+
+
+def bench_layouts(count=10000, rows=16, cols=30, densities=(0.2, 0.5, 0.8)):
+    """Vectorized mine placement at several densities, with an opening first click"""
+    rng = np.random.default_rng(0)
+    results = {}
+    for density in densities:
+        num_bombs = min(bombs_for_density(rows, cols, density), rows * cols - 9)
+        first_clicks = rng.integers(0, (rows, cols), (count, 2))
+        start = time.perf_counter()
+        generate_layouts(count, rows, cols, num_bombs, first_clicks, OPENING, rng)
+        elapsed = time.perf_counter() - start
+        results[f"{density:g}"] = {"num_bombs": num_bombs, "layouts_per_sec": count / elapsed}
+    return results
+
+
+def build_corpus(directory=CORPUS_DIR):
+    """Render the screenshot corpus once; later runs reuse the stored PNGs"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(0)
+    for rows, cols, num_bombs in CORPUS_SIZES:
+        for i in range(FRAMES_PER_SIZE):
+            path = os.path.join(directory, f"{rows}x{cols}_{i}.png")
+            if os.path.exists(path):
+                continue
+            engine = MinesweeperEngine(rows, cols, num_bombs, seed=rng.getrandbits(64))
+            # Open a few cells so frames contain digits as well as blank buttons
+            for _ in range(i * 3):
+                r, c = rng.randrange(rows), rng.randrange(cols)
+                if not engine.mines[r, c]:
+                    engine.reveal(r, c)
+            frame, _ = VirtualFrameRenderer(engine).grab()
+            cv2.imwrite(path, frame)
+
+
+def load_corpus(directory=CORPUS_DIR):
+    """Stored frames grouped by board size"""
+    corpus = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".png"):
+            size = name.split("_")[0]
+            corpus.setdefault(size, []).append(cv2.imread(os.path.join(directory, name)))
+    return corpus
+
+
+def bench_vision(corpus, repeats=5):
+    """Milliseconds per frame for each stage of the vision pipeline, per board size"""
+    results = {}
+    for size, frames in corpus.items():
+        detect, organize, classify, lattice_times = [], [], [], []
+        rows, cols = map(int, size.split("x"))
+        lattice_misses = 0
+        for _ in range(repeats):
+            for frame in frames:
+                start = time.perf_counter()
+                lattice = board_vision.detect_grid_lattice(frame)
+                lattice_times.append(time.perf_counter() - start)
+                if lattice is None or (lattice.rows, lattice.cols) != (rows, cols):
+                    lattice_misses += 1
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    cells = board_vision.detect_grid_cells(frame)
+                    detect.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                grid = board_vision.organize_cells_into_grid(cells)
+                organize.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                board_vision.classify_cells(frame, grid)
+                classify.append(time.perf_counter() - start)
+        results[size] = {
+            "detect_grid_cells": summarize(detect),
+            "organize_cells_into_grid": summarize(organize),
+            "detect_grid_lattice": dict(summarize(lattice_times), wrong_grid=lattice_misses),
+            "analyze_cell_numbers": summarize(classify),
+        }
+    return results
+
+
+def bench_capture(frames=50):
+    """Full-window frames against board-only capture of cell centres, per board size.
+
+    Both paths capture a rendered window and classify it; the byte counts
+    are what each frame hands to the vision pipeline.
+    """
+    results = {}
+    rng = random.Random(0)
+    for rows, cols, num_bombs in CORPUS_SIZES:
+        engine = MinesweeperEngine(rows, cols, num_bombs, seed=rng.getrandbits(64))
+        renderer = VirtualFrameRenderer(engine)
+        frame, _ = renderer.grab()
+        grid = board_vision.lattice_cells(board_vision.detect_grid_lattice(frame))
+        board = BoardCapture(renderer, grid)
+        reader = board_vision.IncrementalBoardReader(board.cells)
+
+        full, cropped = [], []
+        for _ in range(frames):
+            r, c = rng.randrange(rows), rng.randrange(cols)
+            if not engine.mines[r, c]:
+                engine.reveal(r, c)
+            start = time.perf_counter()
+            frame, _ = renderer.grab()
+            board_vision.classify_cells(frame, grid)
+            full.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            mosaic, _ = board.grab()
+            reader.read(mosaic)
+            cropped.append(time.perf_counter() - start)
+        results[f"{rows}x{cols}"] = {
+            "full_frame": dict(summarize(full), bytes=int(frame.nbytes)),
+            "board_capture": dict(summarize(cropped), bytes=int(board.mosaic.nbytes)),
+        }
+    return results
+
+
+def bench_end_to_end(games):
+    """Moves per second for RL_implementation.run_minesweeper_bot on a real display"""
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        return {"skipped": "no display available"}
+    try:
+        import RL_implementation
+    except Exception as e:
+        return {"skipped": f"cannot import RL_implementation: {e}"}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = RL_implementation.run_minesweeper_bot(debug_mode="off", max_games=games)
+    return {
+        "games": stats["games"],
+        "moves": stats["moves"],
+        "moves_per_sec": stats["moves"] / stats["elapsed"],
+    }
+
+
+def find_regressions(results, baseline, tolerance, path=""):
+    """List metrics that got worse than the baseline by more than `tolerance`"""
+    regressions = []
+    for key, value in results.items():
+        old = baseline.get(key) if isinstance(baseline, dict) else None
+        name = f"{path}.{key}" if path else key
+        if isinstance(value, dict) and isinstance(old, dict):
+            regressions += find_regressions(value, old, tolerance, name)
+        elif isinstance(value, (int, float)) and isinstance(old, (int, float)) and old > 0:
+            if key in THROUGHPUT_KEYS and value < old * (1 - tolerance):
+                regressions.append(f"{name}: {old:.4g} -> {value:.4g}")
+            elif key.endswith("_ms") and value > old * (1 + tolerance):
+                regressions.append(f"{name}: {old:.4g} -> {value:.4g}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the engine, vision pipeline and bots")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--games", type=int, default=2000, help="Games for the engine benchmarks")
+    parser.add_argument("--e2e-games", type=int, default=3, help="Games for the end-to-end bot benchmark")
+    parser.add_argument("--skip-e2e", action="store_true", help="Skip the end-to-end bot benchmark")
+    parser.add_argument("--baseline", help="Previous results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    build_corpus()
+    color_lut.load_or_calibrate()
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "engine": {
+            "random_clicks": bench_engine_random(args.games),
+            "auto_mine_headless": bench_auto_mine(args.games // 4),
+            "guesses": bench_guesses(),
+            "vec_env": bench_vec_env(),
+            "layouts": bench_layouts(),
+        },
+        "vision": bench_vision(load_corpus()),
+        "capture": bench_capture(),
+        "end_to_end": {"skipped": "--skip-e2e"} if args.skip_e2e else bench_end_to_end(args.e2e_games),
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against baseline")
@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from board_vision import IncrementalBoardReader
+
+# Emitted whenever at least one cell changes. `board` is a copy of the full
+# board of codes and `changed` lists the (row, col) cells that differ.
+BoardChangeEvent = namedtuple("BoardChangeEvent", "board changed timestamp")
+
+
+class BoardMonitor:
+    """Watch a capture backend and notify subscribers when the board changes.
+
+    Frames are captured at most `fps` times per second. While nothing
+    changes the interval grows by `backoff` per idle frame up to
+    `max_interval`, and it snaps back to the base rate on the next change.
+    `is_alive`, if given, is polled every `alive_check_interval` seconds and
+    stops the monitor when it returns False (e.g. the window closed).
+    """
+
+    def __init__(self, backend, organized_cells, fps=10.0, backoff=1.5, max_interval=1.0,
+                 is_alive=None, alive_check_interval=1.0):
+        self.backend = backend
+        self.reader = IncrementalBoardReader(organized_cells)
+        self.base_interval = 1.0 / fps
+        self.backoff = backoff
+        self.max_interval = max(max_interval, self.base_interval)
+        self.is_alive = is_alive
+        self.alive_check_interval = alive_check_interval
+        self.interval = self.base_interval
+        self.frames = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """Call `callback(event)` on every change; returns a function that unsubscribes"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def events(self, max_pending=64):
+        """Yield change events as they happen until the monitor stops.
+
+        Runs the monitor in the background if it is not already running. When
+        the consumer falls more than `max_pending` events behind, the oldest
+        pending event is dropped.
+        """
+        pending = queue.Queue(maxsize=max_pending)
+
+        def enqueue(event):
+            while True:
+                try:
+                    pending.put_nowait(event)
+                    return
+                except queue.Full:
+                    try:
+                        pending.get_nowait()
+                    except queue.Empty:
+                        pass
+
+        unsubscribe = self.subscribe(enqueue)
+        self.start()
+        try:
+            while not (self._stop.is_set() and pending.empty()):
+                try:
+                    yield pending.get(timeout=self.max_interval)
+                except queue.Empty:
+                    continue
+        finally:
+            unsubscribe()
+
+    def poll(self):
+        """Capture one frame and dispatch an event if anything changed"""
+        image, _ = self.backend.grab()
+        self.frames += 1
+        if image is None:
+            return None
+        board, changed = self.reader.read(image)
+        if not changed:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+            return None
+
+        self.interval = self.base_interval
+        event = BoardChangeEvent(board.copy(), changed, time.time())
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Board change subscriber failed: {e}")
+        return event
+
+    def run(self):
+        """Monitor in the calling thread until stop() is called or the window goes away"""
+        self._stop.clear()
+        next_alive_check = 0.0
+        while not self._stop.is_set():
+            started = time.monotonic()
+            if self.is_alive is not None and started >= next_alive_check:
+                if not self.is_alive():
+                    break
+                next_alive_check = started + self.alive_check_interval
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error during monitoring: {e}")
+                self.interval = self.max_interval
+            # Sleep for whatever is left of the interval, waking early on stop()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        self._stop.set()
+
+    def start(self):
+        """Run the monitor on a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="board-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
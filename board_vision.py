@@ -0,0 +1,420 @@
+from collections import namedtuple
+
+import cv2
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from engine import UNREVEALED
+
+# Code for cells whose centre patch falls outside the image
+UNKNOWN = 255
+
+# Half-size of the square patch sampled at each cell centre
+PATCH_RADIUS = 5
+
+# Color ranges for different numbers (BGR format), checked in this order
+COLOR_RANGES = {
+    1: {'lower': (220, 0, 0), 'upper': (255, 100, 100)},     # Blue
+    2: {'lower': (50, 100, 0), 'upper': (150, 255, 200)},     # Green
+    3: {'lower': (50, 100, 100), 'upper': (100, 150, 255)},   # Red
+    4: {'lower': (128, 0, 128), 'upper': (255, 100, 255)},    # Purple
+    5: {'lower': (0, 0, 128), 'upper': (100, 100, 180)},      # Dark Red
+    6: {'lower': (128, 128, 0), 'upper': (255, 255, 100)},    # Turquoise
+    7: {'lower': (0, 0, 0), 'upper': (50, 50, 50)},           # Black
+    8: {'lower': (100, 100, 100), 'upper': (150, 150, 150)}   # Gray
+}
+
+# Bits kept per BGR channel when indexing the digit lookup table (32 levels)
+LUT_BITS = 5
+
+# Pixels of one digit's colour a patch needs before it reads as that digit
+MIN_DIGIT_PIXELS = 2
+
+# A regular grid of rows x cols cells starting at (x, y), in image pixels
+Lattice = namedtuple("Lattice", "x y pitch_x pitch_y rows cols")
+
+
+def lut_index(pixels, bits=LUT_BITS):
+    """Flat digit-LUT index of every BGR pixel in an (..., 3) uint8 array"""
+    dtype = np.uint16 if 3 * bits <= 16 else np.intp
+    q = pixels >> (8 - bits)
+    return ((q[..., 0].astype(dtype) << (2 * bits)) |
+            (q[..., 1].astype(dtype) << bits) | q[..., 2])
+
+
+def build_range_lut(color_ranges, bits=LUT_BITS):
+    """Compile color ranges into a flat (2**bits)**3 table of digit labels.
+
+    Each quantized colour is labelled by the first digit whose range holds
+    the centre of its bin, or 0 when no range does.
+    """
+    levels = 1 << bits
+    centres = (np.arange(levels) << (8 - bits)) + (1 << (7 - bits))
+    b, g, r = np.meshgrid(centres, centres, centres, indexing="ij")
+    lut = np.zeros((levels, levels, levels), dtype=np.uint8)
+    for digit in reversed(list(color_ranges)):
+        lower, upper = color_ranges[digit]['lower'], color_ranges[digit]['upper']
+        inside = ((b >= lower[0]) & (b <= upper[0]) & (g >= lower[1]) & (g <= upper[1]) &
+                  (r >= lower[2]) & (r <= upper[2]))
+        lut[inside] = digit
+    return lut.ravel()
+
+
+# Digit label for every quantized colour; color_lut.py installs a calibrated one
+_DIGIT_LUT = build_range_lut(COLOR_RANGES)
+
+
+def set_digit_lut(lut):
+    """Classify digits with `lut`, a flat table from lut_index() to labels 0-8"""
+    global _DIGIT_LUT
+    lut = np.asarray(lut, dtype=np.uint8).ravel()
+    if lut.size != 1 << (3 * LUT_BITS):
+        raise ValueError(f"Digit LUT has {lut.size} entries, expected {1 << (3 * LUT_BITS)}")
+    _DIGIT_LUT = lut
+
+
+def detect_grid_cells(image, aspect_range=(0.5, 1.2), min_size=20, max_size=100,
+                      area_tolerance=0.5, on_debug_image=None):
+    """Detect individual cells using contrast detection.
+
+    Returns (x, y, w, h) rectangles of roughly square contours whose area is
+    within `area_tolerance` of the median. `on_debug_image(img, name)` is
+    called with the thresholded edge image when given.
+    """
+    # Convert to grayscale
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # Apply adaptive thresholding to handle different lighting conditions
+    thresh = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY_INV, 11, 2
+    )
+    # Inflate the edges to make them more pronounced
+    kernel = np.ones((3, 3), np.uint8)
+    thresh = cv2.dilate(thresh, kernel, iterations=2)
+    if on_debug_image is not None:
+        on_debug_image(thresh, "threshold_debug")
+
+    # Find contours of all cells
+    contours, _ = cv2.findContours(thresh, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+
+    # Filter contours to find cells (looking for squares of similar size)
+    cell_contours = []
+    areas = []
+    for cnt in contours:
+        x, y, w, h = cv2.boundingRect(cnt)
+        # Filter by aspect ratio (cells should be roughly square)
+        aspect_ratio = float(w) / h
+        if aspect_range[0] <= aspect_ratio <= aspect_range[1]:
+            # Filter by size (cells should be reasonably sized)
+            if w >= min_size and h >= min_size and \
+                    (max_size is None or (w <= max_size and h <= max_size)):
+                cell_contours.append((x, y, w, h))
+                areas.append(w * h)
+
+    # If we found cells, keep only those with area close to the median
+    if areas:
+        median_area = np.median(areas)
+        cell_contours = [(x, y, w, h) for x, y, w, h in cell_contours
+                         if (1 - area_tolerance) * median_area <= w * h <= (1 + area_tolerance) * median_area]
+
+    print(f"Detected {len(cell_contours)} potential cells")
+    return cell_contours
+
+
+def organize_cells_into_grid(cell_contours, row_tolerance=0.5):
+    """Organize detected cells into rows sorted left to right.
+
+    A cell starts a new row when its top edge is more than `row_tolerance`
+    cell heights below the first cell of the current row.
+    """
+    if not cell_contours:
+        return None
+
+    # Sort cells by y-coordinate (row) first
+    cell_contours = sorted(cell_contours, key=lambda c: c[1])
+
+    # Identify rows by grouping cells with similar y-coordinates
+    rows = []
+    current_row = [cell_contours[0]]
+    row_height = cell_contours[0][3]  # Height of first cell
+
+    for cell in cell_contours[1:]:
+        # If this cell is significantly below the previous row, start a new row
+        if abs(cell[1] - current_row[0][1]) > row_height * row_tolerance:
+            rows.append(current_row)
+            current_row = [cell]
+        else:
+            current_row.append(cell)
+
+    # Add the last row
+    if current_row:
+        rows.append(current_row)
+
+    # Sort each row by x-coordinate
+    for row in rows:
+        row.sort(key=lambda c: c[0])
+
+    return rows
+
+
+def _fold(profile, pitch):
+    """Mean of a profile over every whole period of `pitch` samples"""
+    n = len(profile) - len(profile) % pitch
+    return profile[:n].reshape(-1, pitch).mean(axis=0)
+
+
+def _profile_period(profile, min_pitch, max_pitch):
+    """Period of the grid lines in a darkness profile, or None.
+
+    The autocorrelation (normalized by overlap) peaks at the period and
+    again at each multiple of it, so the smallest whole fraction of the
+    best lag wins when its peak is nearly as high and folding at it keeps
+    the fold's contrast (digits centred in cells also peak at half the
+    period, but folding them onto the borders washes the borders out).
+    """
+    n = len(profile)
+    max_pitch = min(max_pitch, n // 3)
+    if max_pitch < min_pitch:
+        return None
+    centred = profile - profile.mean()
+    spectrum = np.fft.rfft(centred, 2 * n)
+    lags = np.arange(min_pitch, max_pitch + 1)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum))[lags] / (n - lags)
+    best = int(autocorr.argmax())
+    if autocorr[best] <= 0:
+        return None
+    pitch = int(lags[best])
+    contrast = np.ptp(_fold(profile, pitch))
+    for fraction in range(min_pitch, pitch // 2 + 1):
+        if pitch % fraction == 0 and autocorr[fraction - min_pitch] >= 0.85 * autocorr[best] \
+                and np.ptp(_fold(profile, fraction)) >= 0.75 * contrast:
+            return fraction
+    return pitch
+
+
+def _lattice_axis(profile, min_pitch, max_pitch):
+    """(start, pitch, cells) of the longest run of regular grid cells in a darkness profile"""
+    pitch = _profile_period(profile, min_pitch, max_pitch)
+    if pitch is None:
+        return None
+    n = len(profile)
+    fold = _fold(profile, pitch)
+
+    # Borders are dark in every cell while bevels and digits vary, so the
+    # darkest phase is the border; a cell starts at its last pixel, just
+    # before the lighter face
+    darkest = fold >= fold.max() - 0.25 * np.ptp(fold)
+    offset = int(fold.argmax())
+    while darkest[(offset + 1) % pitch] and (offset + 1) % pitch != fold.argmax():
+        offset = (offset + 1) % pitch
+
+    # A board cell starts on a line clearly darker than its face; margins,
+    # the status label and uniform background do not
+    starts = np.arange(offset, n - pitch // 2, pitch)
+    faces = np.pad(profile, (0, pitch), mode="edge")[starts[:, None] + np.arange(pitch // 4, 3 * pitch // 4)]
+    contrast = profile[starts] - faces.mean(axis=1)
+    is_cell = np.append(contrast > 0.5 * contrast.max(), False)
+
+    # Longest run of consecutive cells
+    best_start, best_len, start = 0, 0, None
+    for i, cell in enumerate(is_cell):
+        if cell and start is None:
+            start = i
+        elif not cell and start is not None:
+            if i - start > best_len:
+                best_start, best_len = start, i - start
+            start = None
+    if best_len < 2:
+        return None
+    return int(starts[best_start]), pitch, best_len
+
+
+def detect_grid_lattice(image, roi=None, min_pitch=12, max_pitch=100):
+    """Find the board as a regular lattice from row and column intensity projections.
+
+    Cell borders are darker than cell faces across the whole board, so the
+    mean darkness of each pixel row (and column) peaks once per cell. The
+    pitch is the period of that profile and the board extent is the longest
+    run of cells whose border is clearly darker than their face. The
+    profiles are plain row and column means, so detection is linear in the
+    number of pixels. `roi` is an (x, y, w, h) rectangle to
+    search within. Returns a Lattice in image coordinates, or None when no
+    regular grid of at least 2x2 cells is found.
+    """
+    x0, y0 = 0, 0
+    if roi is not None:
+        x0, y0, w, h = roi
+        image = image[y0:y0 + h, x0:x0 + w]
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+    row_profile = 255 - cv2.reduce(gray, 1, cv2.REDUCE_AVG, dtype=cv2.CV_32F).ravel()
+    row_axis = _lattice_axis(row_profile, min_pitch, max_pitch)
+    if row_axis is None:
+        return None
+    top, pitch_y, rows = row_axis
+
+    # Only the board's rows, so the status label does not blur the columns
+    board = gray[top:top + rows * pitch_y]
+    col_profile = 255 - cv2.reduce(board, 0, cv2.REDUCE_AVG, dtype=cv2.CV_32F).ravel()
+    col_axis = _lattice_axis(col_profile, min_pitch, max_pitch)
+    if col_axis is None:
+        return None
+    left, pitch_x, cols = col_axis
+    return Lattice(x0 + left, y0 + top, pitch_x, pitch_y, rows, cols)
+
+
+def lattice_cells(lattice):
+    """(x, y, w, h) cells of a lattice in rows, as organize_cells_into_grid returns them"""
+    x, y, pitch_x, pitch_y, rows, cols = lattice
+    return [[(x + c * pitch_x, y + r * pitch_y, pitch_x, pitch_y) for c in range(cols)]
+            for r in range(rows)]
+
+
+def detect_grid(image, roi=None, row_tolerance=0.5, **contour_options):
+    """Organized cells from the lattice detector, falling back to contour detection.
+
+    The fallback searches the whole image with detect_grid_cells(), passing
+    it `contour_options`, and groups rows with `row_tolerance`.
+    """
+    lattice = detect_grid_lattice(image, roi)
+    if lattice is not None:
+        print(f"Detected a {lattice.rows}x{lattice.cols} lattice with "
+              f"{lattice.pitch_x}x{lattice.pitch_y} pixel cells")
+        return lattice_cells(lattice)
+    return organize_cells_into_grid(detect_grid_cells(image, **contour_options), row_tolerance)
+
+
+# The bots reuse one organized_cells list for every frame of a game
+_last_centres = (None, None)
+
+
+def cell_centres(organized_cells):
+    """Centre coordinates of every cell as (rows, cols) arrays plus a validity mask.
+
+    Rows of different lengths are padded; padded entries are marked invalid.
+    The result for the most recent grid is cached.
+    """
+    global _last_centres
+    if _last_centres[0] is organized_cells:
+        return _last_centres[1]
+    num_rows = len(organized_cells)
+    num_cols = max((len(row) for row in organized_cells), default=0)
+    if num_rows and all(len(row) == num_cols for row in organized_cells):
+        # Rectangular grid: convert all rectangles in one go
+        rects = np.asarray(organized_cells, dtype=np.intp).reshape(num_rows, num_cols, 4)
+        cx = rects[..., 0] + rects[..., 2] // 2
+        cy = rects[..., 1] + rects[..., 3] // 2
+        present = np.ones((num_rows, num_cols), dtype=bool)
+    else:
+        cx = np.zeros((num_rows, num_cols), dtype=np.intp)
+        cy = np.zeros((num_rows, num_cols), dtype=np.intp)
+        present = np.zeros((num_rows, num_cols), dtype=bool)
+        for r, row in enumerate(organized_cells):
+            for c, (x, y, w, h) in enumerate(row):
+                cx[r, c] = x + w // 2
+                cy[r, c] = y + h // 2
+                present[r, c] = True
+    _last_centres = (organized_cells, (cx, cy, present))
+    return cx, cy, present
+
+
+def gather_patches(image, cx, cy, radius=PATCH_RADIUS):
+    """Collect every cell-centre patch into one (cells, 2r, 2r, 3) array.
+
+    All patches are copied out in a single indexing operation on a sliding
+    window view of the image. Returns the patches and a mask of the cells
+    whose patch lies fully inside the image; other cells get a shifted patch.
+    """
+    height, width = image.shape[:2]
+    size = 2 * radius
+    top = cy.ravel() - radius
+    left = cx.ravel() - radius
+    inside = (top >= 0) & (top + size <= height) & (left >= 0) & (left + size <= width)
+    windows = sliding_window_view(image, (size, size), axis=(0, 1))
+    patches = windows[np.clip(top, 0, height - size), np.clip(left, 0, width - size)]
+    return np.moveaxis(patches, 1, -1), inside
+
+
+def classify_patches(patches):
+    """Classify a (cells, h, w, 3) BGR patch stack into board codes"""
+    num_cells = patches.shape[0]
+    # Digit label of every pixel in one gather, then a label histogram per cell
+    labels = _DIGIT_LUT.take(lut_index(patches)).reshape(num_cells, -1)
+    offsets = np.arange(num_cells)[:, None] * 9
+    histogram = np.bincount((labels + offsets).ravel(), minlength=num_cells * 9).reshape(num_cells, 9)
+    digits = histogram[:, 1:].argmax(axis=1)
+    codes = (digits + 1).astype(np.uint8)
+    # Unrevealed buttons and blank cells show no digit colour
+    codes[histogram[np.arange(num_cells), digits + 1] < MIN_DIGIT_PIXELS] = UNREVEALED
+    return codes
+
+
+def classify_cells(image, organized_cells):
+    """Classify every cell of the organized grid in one vectorized pass.
+
+    Returns a (rows, cols) uint8 board: 1-8 for digits, UNREVEALED for
+    unrevealed or blank cells and UNKNOWN where no patch could be sampled.
+    """
+    cx, cy, present = cell_centres(organized_cells)
+    patches, inside = gather_patches(image, cx, cy)
+    codes = classify_patches(patches)
+    codes[~(inside & present.ravel())] = UNKNOWN
+    return codes.reshape(present.shape)
+
+
+def board_to_strings(board):
+    """Render board codes as the grid of strings the bots used to print"""
+    symbols = {UNREVEALED: " ", UNKNOWN: "?"}
+    return [[symbols.get(int(code), str(int(code))) for code in row] for row in board]
+
+
+class IncrementalBoardReader:
+    """Classify only the cells whose centre patch changed since the last frame.
+
+    Each frame the centre patches are gathered as usual and compared against
+    the previous frame's patches; only cells with a differing pixel are
+    re-classified. read() returns the updated board and the changed cells;
+    `dirty` then holds every cell whose pixels changed, including cells that
+    classified the same as before (e.g. a blank button becoming a revealed
+    empty cell).
+    """
+
+    def __init__(self, organized_cells):
+        self.organized_cells = organized_cells
+        self.reset()
+
+    def reset(self):
+        """Forget the previous frame so the next read classifies every cell"""
+        self.board = None
+        self._patches = None
+        self.dirty = []
+
+    def read(self, image):
+        """Return (board, changed) where changed lists the (row, col) cells that differ"""
+        cx, cy, present = cell_centres(self.organized_cells)
+        patches, inside = gather_patches(image, cx, cy)
+        num_cells = patches.shape[0]
+        num_cols = present.shape[1]
+
+        if self.board is None:
+            codes = classify_patches(patches)
+            codes[~(inside & present.ravel())] = UNKNOWN
+            self.board = codes.reshape(present.shape)
+            self._patches = patches
+            changed = dirty = np.flatnonzero(present.ravel())
+        else:
+            differs = np.any((patches != self._patches).reshape(num_cells, -1), axis=1)
+            dirty = np.flatnonzero(differs)
+            self._patches = patches
+            if dirty.size == 0:
+                self.dirty = []
+                return self.board, []
+            flat = self.board.reshape(-1)
+            codes = classify_patches(patches[dirty])
+            codes[~inside[dirty]] = UNKNOWN
+            # A cell whose pixels moved can still classify the same
+            changed = dirty[codes != flat[dirty]]
+            flat[dirty] = codes
+
+        self.dirty = [divmod(int(i), num_cols) for i in dirty]
+        return self.board, [divmod(int(i), num_cols) for i in changed]
@@ -0,0 +1,112 @@
+import tkinter as tk
+import numpy as np
+
+from engine import LOST
+
+HIDDEN_FILL = "#f0f0f0"
+REVEALED_FILL = "#d3d3d3"
+FLAG_FILL = "yellow"
+GRID_LINE = "#808080"
+
+
+class CanvasBoardView:
+    """Draw a whole board on a single tk.Canvas.
+
+    One rectangle item per cell is created up front; digits, flags and bombs
+    are text items created only when needed. Clicks are mapped to cells by
+    dividing the pointer position by the cell size, and every cell opened by
+    a reveal is updated before a single idle redraw.
+    """
+
+    def __init__(self, master, engine, color_map, cell_size=24, on_status_change=None):
+        self.engine = engine
+        self.color_map = color_map
+        self.cell_size = cell_size
+        self.on_status_change = on_status_change
+        self.font = ("Arial", max(8, cell_size // 2), "bold")
+
+        self.canvas = tk.Canvas(master, width=engine.cols * cell_size, height=engine.rows * cell_size,
+                                highlightthickness=0, bg=HIDDEN_FILL)
+        self.canvas.bind("<Button-1>", self._on_left_click)
+        self.canvas.bind("<Button-3>", self._on_right_click)
+
+        self.rects = np.zeros((engine.rows, engine.cols), dtype=np.int64)
+        self.flag_items = {}
+        self.draw_board()
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def draw_board(self):
+        """Create the cell rectangles for a fresh board"""
+        self.canvas.delete("all")
+        self.flag_items.clear()
+        size = self.cell_size
+        create = self.canvas.create_rectangle
+        for r in range(self.engine.rows):
+            y = r * size
+            for c in range(self.engine.cols):
+                x = c * size
+                self.rects[r, c] = create(x, y, x + size, y + size, fill=HIDDEN_FILL, outline=GRID_LINE)
+
+    def cell_at(self, x, y):
+        """Cell under a canvas coordinate, or None outside the board"""
+        r, c = int(y) // self.cell_size, int(x) // self.cell_size
+        if 0 <= r < self.engine.rows and 0 <= c < self.engine.cols:
+            return r, c
+        return None
+
+    def _on_left_click(self, event):
+        cell = self.cell_at(event.x, event.y)
+        if cell is not None:
+            self.click(*cell)
+
+    def _on_right_click(self, event):
+        cell = self.cell_at(event.x, event.y)
+        if cell is not None:
+            self.toggle_flag(*cell)
+        return "break"
+
+    def _centre(self, r, c):
+        half = self.cell_size // 2
+        return c * self.cell_size + half, r * self.cell_size + half
+
+    def click(self, r, c):
+        """Reveal a cell and redraw everything it opened in one batch"""
+        if self.engine.game_over or self.engine.flags[r, c]:
+            return
+        newly_revealed = self.engine.reveal(r, c)
+        if self.engine.status == LOST:
+            self.show_bombs()
+        else:
+            self.draw_revealed_cells(newly_revealed)
+            if self.engine.game_over:
+                self.show_bombs()
+        if self.engine.game_over and self.on_status_change is not None:
+            self.on_status_change(self.engine.status)
+        self.canvas.update_idletasks()
+
+    def toggle_flag(self, r, c):
+        if self.engine.revealed[r, c] or self.engine.game_over:
+            return
+        if self.engine.toggle_flag(r, c):
+            self.canvas.itemconfigure(int(self.rects[r, c]), fill=FLAG_FILL)
+            self.flag_items[(r, c)] = self.canvas.create_text(*self._centre(r, c), text="🚩", font=self.font)
+        else:
+            self.canvas.itemconfigure(int(self.rects[r, c]), fill=HIDDEN_FILL)
+            self.canvas.delete(self.flag_items.pop((r, c), None))
+
+    def draw_revealed_cells(self, cells):
+        """Update the items for a batch of newly revealed cells"""
+        canvas = self.canvas
+        counts = self.engine.counts
+        for r, c in cells.tolist():
+            canvas.itemconfigure(int(self.rects[r, c]), fill=REVEALED_FILL)
+            count = int(counts[r, c])
+            if count > 0:
+                canvas.create_text(*self._centre(r, c), text=str(count), font=self.font,
+                                   fill=self.color_map.get(count, "black"))
+
+    def show_bombs(self):
+        for r, c in np.argwhere(self.engine.mines).tolist():
+            self.canvas.create_text(*self._centre(r, c), text="💣", font=self.font)
@@ -0,0 +1,356 @@
+import time
+import numpy as np
+import cv2
+
+from board_vision import PATCH_RADIUS, cell_centres
+from instrumentation import recorder, CAPTURE, UI_WAIT
+from gui import color_map, STATUS_TEXT
+
+
+class CaptureBackend:
+    """Source of BGR frames of the game window.
+
+    grab() returns (image, (x, y, width, height)) with the window rectangle in
+    screen coordinates, or (None, rect) when no usable frame is available.
+    grab_region(rect) returns just a rectangle of the window, given in window
+    coordinates, with its channels in `region_order` (or None); backends that
+    can grab part of the screen return the grabbed RGB pixels unconverted.
+    """
+
+    region_order = "BGR"
+
+    def grab(self):
+        raise NotImplementedError
+
+    def grab_region(self, rect):
+        image, _ = self.grab()
+        if image is None:
+            return None
+        x, y, width, height = rect
+        return image[y:y + height, x:x + width]
+
+
+class TkWindowCapture(CaptureBackend):
+    """Screenshot a Tk root window with PyAutoGUI"""
+
+    region_order = "RGB"
+
+    def __init__(self, root, settle_delay=0.1):
+        self.root = root
+        self.settle_delay = settle_delay
+
+    def window_rect(self):
+        root = self.root
+        return root.winfo_rootx(), root.winfo_rooty(), root.winfo_width(), root.winfo_height()
+
+    def _settle(self):
+        with recorder.stage(UI_WAIT):
+            # Force window update and focus
+            self.root.update_idletasks()
+            self.root.update()
+            self.root.focus_force()
+            self.root.lift()
+
+            # Small delay to ensure window is rendered
+            time.sleep(self.settle_delay)
+
+    def grab(self):
+        import pyautogui
+
+        self._settle()
+        with recorder.stage(CAPTURE):
+            rect = self.window_rect()
+            x, y, width, height = rect
+            # Verify coordinates are valid
+            if width <= 10 or height <= 10 or x < 0 or y < 0:
+                print(f"Invalid window dimensions")
+                return None, rect
+
+            screenshot = np.array(pyautogui.screenshot(region=rect))
+            return cv2.cvtColor(screenshot, cv2.COLOR_RGB2BGR), rect
+
+    def grab_region(self, rect):
+        import pyautogui
+
+        self._settle()
+        with recorder.stage(CAPTURE):
+            x, y = self.root.winfo_rootx(), self.root.winfo_rooty()
+            if x < 0 or y < 0:
+                return None
+            return np.asarray(pyautogui.screenshot(region=(x + rect[0], y + rect[1], rect[2], rect[3])))
+
+
+class WindowTitleCapture(CaptureBackend):
+    """Find a window by title and grab it with PIL's ImageGrab.
+
+    The window is looked up and brought to the front once, then its handle
+    is reused; it is only looked up (and activated) again after a grab fails.
+    """
+
+    region_order = "RGB"
+
+    def __init__(self, title="Sample Game", settle_delay=0.2):
+        self.title = title
+        self.settle_delay = settle_delay
+        self.window = None
+
+    def reset(self):
+        """Look the window up again on the next grab, e.g. after a new game window opened"""
+        self.window = None
+
+    def _activate(self):
+        """The cached window, finding and activating it first if needed; None if there is none"""
+        if self.window is None:
+            import pyautogui
+
+            with recorder.stage(UI_WAIT):
+                windows = pyautogui.getWindowsWithTitle(self.title)
+                if not windows:
+                    return None
+                windows[0].activate()
+                time.sleep(self.settle_delay)  # Wait for window to come to foreground
+            self.window = windows[0]
+        return self.window
+
+    def _window_rect(self):
+        """Screen rectangle of the game window, or None when it cannot be found"""
+        window = self._activate()
+        if window is None:
+            return None
+        try:
+            return window.left, window.top, window.width, window.height
+        except Exception as e:
+            print(f"Lost window '{self.title}': {e}")
+            self.window = None
+            return None
+
+    def _grab_bbox(self, left, top, width, height):
+        from PIL import ImageGrab
+
+        try:
+            with recorder.stage(CAPTURE):
+                return np.asarray(ImageGrab.grab(bbox=(left, top, left + width, top + height)))
+        except Exception as e:
+            print(f"Could not grab window '{self.title}': {e}")
+            self.window = None  # Closed or moved off screen; look it up again next time
+            return None
+
+    def grab(self):
+        rect = self._window_rect()
+        if rect is None:
+            return None, (0, 0, 0, 0)
+        screenshot = self._grab_bbox(*rect)
+        if screenshot is None:
+            return None, rect
+        return cv2.cvtColor(screenshot, cv2.COLOR_RGB2BGR), rect
+
+    def grab_region(self, rect):
+        window_rect = self._window_rect()
+        if window_rect is None:
+            return None
+        return self._grab_bbox(window_rect[0] + rect[0], window_rect[1] + rect[1], rect[2], rect[3])
+
+
+class BoardCapture(CaptureBackend):
+    """Capture only the board's bounding box once the grid geometry is known.
+
+    Each grab asks `backend` for just the board region and copies it into
+    a buffer allocated up front. grab() fills a small BGR mosaic holding only
+    the centre patch of every cell; `cells` are the organized cells of that
+    mosaic, so IncrementalBoardReader and classify_cells read it exactly as
+    they would the full window. Grid detection still runs on full-window
+    frames, since it is what finds the board in the first place.
+    """
+
+    def __init__(self, backend, organized_cells, radius=PATCH_RADIUS):
+        self.backend = backend
+        rects = [cell for row in organized_cells for cell in row]
+        left = min(x for x, _, _, _ in rects)
+        top = min(y for _, y, _, _ in rects)
+        right = max(x + w for x, _, w, _ in rects)
+        bottom = max(y + h for _, y, _, h in rects)
+        self.rect = (left, top, right - left, bottom - top)
+        width, height = self.rect[2], self.rect[3]
+
+        # One tile per cell, laid out like the board, holding its centre patch
+        size = 2 * radius
+        cx, cy, present = cell_centres(organized_cells)
+        num_rows, num_cols = present.shape
+        self.mosaic = np.empty((num_rows * size, num_cols * size, 3), dtype=np.uint8)
+        self.cells = [[(c * size, r * size, size, size) for c in range(len(row))]
+                      for r, row in enumerate(organized_cells)]
+
+        # Flat index into the region feeding every mosaic byte, for either channel order
+        offsets = np.arange(size) - radius
+        ys = np.clip(cy[:, None, :, None] + offsets[None, :, None, None] - top, 0, height - 1)
+        xs = np.clip(cx[:, None, :, None] + offsets[None, None, None, :] - left, 0, width - 1)
+        pixels = (ys * width + xs).reshape(num_rows * size, num_cols * size, 1) * 3
+        self._index = {"BGR": pixels + np.array([0, 1, 2]), "RGB": pixels + np.array([2, 1, 0])}
+
+    def _region(self):
+        region = self.backend.grab_region(self.rect)
+        if region is None or region.shape[:2] != (self.rect[3], self.rect[2]):
+            return None
+        # Screen grabs are contiguous already; only crops of a wider frame are copied
+        return np.ascontiguousarray(region)
+
+    def _fill_mosaic(self, region, order):
+        # Not a stage of its own: the backend's grab already recorded this frame's capture
+        np.take(region.reshape(-1), self._index[order], out=self.mosaic, mode="clip")
+        return self.mosaic
+
+    def grab(self):
+        """Capture the board region; returns (mosaic, board rect in window coordinates)"""
+        region = self._region()
+        if region is None:
+            return None, self.rect
+        return self._fill_mosaic(region, self.backend.region_order), self.rect
+
+    def load(self, image):
+        """Fill the mosaic from a full BGR window frame already captured, and return it"""
+        x, y, width, height = self.rect
+        return self._fill_mosaic(np.ascontiguousarray(image[y:y + height, x:x + width]), "BGR")
+
+
+# Tk colour names used by gui.py, as BGR
+TK_COLORS = {
+    "blue": (255, 0, 0),
+    "green": (0, 128, 0),
+    "red": (0, 0, 255),
+    "purple": (128, 0, 128),
+    "maroon": (0, 0, 128),
+    "turquoise": (208, 224, 64),
+    "black": (0, 0, 0),
+    "gray": (128, 128, 128),
+    "yellow": (0, 255, 255),
+}
+
+BUTTON_FACE = (240, 240, 240)  # SystemButtonFace
+SUNKEN_FACE = (211, 211, 211)  # "#d3d3d3" used for revealed empty cells
+LIGHT_EDGE = (255, 255, 255)
+DARK_EDGE = (105, 105, 105)
+SHADOW_EDGE = (160, 160, 160)
+
+# Tile indices beyond the 0-8 counts
+TILE_UNREVEALED = 9
+TILE_FLAGGED = 10
+TILE_BOMB = 11
+
+
+def tile_state(engine):
+    """Tile index gui.py shows for every cell of an engine's current board"""
+    state = np.where(engine.revealed, engine.counts, TILE_UNREVEALED).astype(np.uint8)
+    state[engine.flags & ~engine.revealed] = TILE_FLAGGED
+    if engine.game_over:
+        # gui.py shows every bomb once the game is decided
+        state[engine.mines] = TILE_BOMB
+    return state
+
+
+class VirtualFrameRenderer(CaptureBackend):
+    """Rasterize an engine's board straight into a BGR frame shaped like gui.py's window.
+
+    Each cell is drawn as a Tk-style button (raised for unrevealed and
+    numbered cells, sunken grey for revealed empty cells) with digits in
+    gui.color_map colours, followed by the status label strip. Tiles are
+    pre-rendered once and only cells whose state changed since the previous
+    grab are copied into the frame, so rendering costs almost nothing and
+    needs no display.
+    """
+
+    def __init__(self, engine, cell_size=42, label_height=24, origin=(0, 0)):
+        self.engine = engine
+        self.cell_size = cell_size
+        self.label_height = label_height
+        self.origin = origin
+        self.tiles = self._render_tiles(cell_size)
+        self.reset()
+
+    def reset(self):
+        """Redraw the whole frame on the next grab (e.g. after engine.reset())"""
+        height = self.engine.rows * self.cell_size + self.label_height
+        width = self.engine.cols * self.cell_size
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+        self.frame[:] = BUTTON_FACE
+        self._state = None
+        self._status = None
+
+    def cell_rect(self, r, c):
+        """Screen rectangle of a cell's button, matching what detection should find"""
+        size = self.cell_size
+        return self.origin[0] + c * size, self.origin[1] + r * size, size, size
+
+    def _render_tiles(self, size):
+        def button(face, raised):
+            tile = np.empty((size, size, 3), dtype=np.uint8)
+            tile[:] = face
+            top_left, bottom_right = (LIGHT_EDGE, DARK_EDGE) if raised else (DARK_EDGE, LIGHT_EDGE)
+            cv2.rectangle(tile, (0, 0), (size - 1, size - 1), DARK_EDGE, 1)  # Highlight ring
+            tile[1:size - 1, 1:3] = top_left
+            tile[1:3, 1:size - 1] = top_left
+            tile[1:size - 1, size - 3:size - 1] = bottom_right
+            tile[size - 3:size - 1, 1:size - 1] = bottom_right
+            if raised:
+                tile[3:size - 3, size - 4] = SHADOW_EDGE
+                tile[size - 4, 3:size - 3] = SHADOW_EDGE
+            return tile
+
+        def centred_text(tile, text, color):
+            font, scale, thickness = cv2.FONT_HERSHEY_SIMPLEX, size / 50, 2
+            (w, h), _ = cv2.getTextSize(text, font, scale, thickness)
+            cv2.putText(tile, text, ((size - w) // 2, (size + h) // 2), font, scale,
+                        color, thickness, cv2.LINE_AA)
+            return tile
+
+        tiles = [button(SUNKEN_FACE, raised=False)]
+        for count in range(1, 9):
+            color = TK_COLORS[color_map.get(count, "black")]
+            tiles.append(centred_text(button(BUTTON_FACE, raised=True), str(count), color))
+        tiles.append(button(BUTTON_FACE, raised=True))
+
+        flagged = button(TK_COLORS["yellow"], raised=True)
+        pole = size // 2
+        cv2.line(flagged, (pole, size // 4), (pole, 3 * size // 4), (0, 0, 0), 2)
+        triangle = np.array([[pole, size // 4], [pole, size // 2], [size // 4, 3 * size // 8]])
+        cv2.fillPoly(flagged, [triangle], (0, 0, 255), cv2.LINE_AA)
+        tiles.append(flagged)
+
+        bomb = button(BUTTON_FACE, raised=True)
+        cv2.circle(bomb, (size // 2, size // 2), size // 5, (0, 0, 0), -1, cv2.LINE_AA)
+        tiles.append(bomb)
+        return np.stack(tiles)
+
+    def tile_state(self):
+        """Tile index for every cell of the engine's current board"""
+        return tile_state(self.engine)
+
+    def render(self):
+        """Bring the frame up to date with the engine and return it"""
+        state = self.tile_state()
+        if self._state is None or self._state.shape != state.shape:
+            dirty = np.argwhere(np.ones(state.shape, dtype=bool))
+        else:
+            dirty = np.argwhere(state != self._state)
+        size = self.cell_size
+        for r, c in dirty.tolist():
+            self.frame[r * size:(r + 1) * size, c * size:(c + 1) * size] = self.tiles[state[r, c]]
+        self._state = state
+
+        status = self.engine.status
+        if status != self._status:
+            text = STATUS_TEXT[status]
+            strip = self.frame[self.engine.rows * size:]
+            strip[:] = BUTTON_FACE
+            font, scale = cv2.FONT_HERSHEY_SIMPLEX, 0.5
+            (w, h), _ = cv2.getTextSize(text, font, scale, 1)
+            cv2.putText(strip, text, ((strip.shape[1] - w) // 2, (strip.shape[0] + h) // 2),
+                        font, scale, (0, 0, 0), 1, cv2.LINE_AA)
+            self._status = status
+        return self.frame
+
+    def grab(self):
+        """Return the rendered frame; the same buffer is updated by later grabs"""
+        with recorder.stage(CAPTURE):
+            frame = self.render()
+        height, width = frame.shape[:2]
+        return frame, (self.origin[0], self.origin[1], width, height)
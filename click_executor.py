@@ -0,0 +1,62 @@
+import time
+
+from engine import UNREVEALED
+from instrumentation import recorder, CLICK, CLASSIFICATION
+
+
+class ClickExecutor:
+    """Issue a batch of clicks, then verify them all with one capture.
+
+    `click(row, col)` performs a single click and `capture()` returns a BGR
+    frame of the window (or None). Clicks in a batch are spaced by
+    `spacing` seconds only; the capture backend's own settle delay is the
+    one wait per batch. The frame is read with an IncrementalBoardReader,
+    so a click counts as registered when its cell's pixels changed or the
+    cell now shows a digit. Missed clicks are re-issued up to `retries`
+    times before being reported back.
+    """
+
+    def __init__(self, click, capture, reader, spacing=0.01, retries=1):
+        self.click = click
+        self.capture = capture
+        self.reader = reader
+        self.spacing = spacing
+        self.retries = retries
+
+    def prime(self, image):
+        """Read a baseline frame so the next verification only sees new changes"""
+        self.reader.reset()
+        with recorder.stage(CLASSIFICATION):
+            return self.reader.read(image)[0]
+
+    def click_all(self, cells):
+        for i, (row, col) in enumerate(cells):
+            if i and self.spacing:
+                time.sleep(self.spacing)
+            with recorder.stage(CLICK):
+                self.click(row, col)
+
+    def verify(self, cells):
+        """Capture once and return (board, missed) for the clicked cells"""
+        image = self.capture()
+        if image is None:
+            return None, list(cells)
+        with recorder.stage(CLASSIFICATION):
+            board, _ = self.reader.read(image)
+        dirty = set(self.reader.dirty)
+        missed = [(row, col) for row, col in cells
+                  if (row, col) not in dirty and board[row, col] >= UNREVEALED]
+        return board, missed
+
+    def execute(self, cells):
+        """Click every cell and return (board, missed) after verification"""
+        cells = list(cells)
+        self.click_all(cells)
+        board, missed = self.verify(cells)
+        for _ in range(self.retries):
+            if not missed or board is None:
+                break
+            print(f"Retrying {len(missed)} click(s) that did not register: {missed}")
+            self.click_all(missed)
+            board, missed = self.verify(missed)
+        return board, missed
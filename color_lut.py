@@ -0,0 +1,188 @@
+import hashlib
+import os
+import random
+import tkinter as tk
+
+import numpy as np
+
+import board_vision
+from board_vision import LUT_BITS, PATCH_RADIUS, build_range_lut, cell_centres, gather_patches, lut_index
+import gui
+from capture import TkWindowCapture, VirtualFrameRenderer, TILE_FLAGGED, tile_state
+from engine import MinesweeperEngine
+from gui import color_map
+
+# Where the calibrated digit LUT is cached between runs
+LUT_PATH = "digit_lut.npz"
+
+# Boards played for calibration, and the cell sizes they are rendered at
+# when no live game window can be captured
+CALIBRATION_CELL_SIZES = (24, 32, 42, 56)
+CALIBRATION_BOARDS = ((9, 9, 10), (16, 16, 40), (16, 30, 99))
+
+# Bump when the calibration procedure changes so cached tables are rebuilt
+CALIBRATION_VERSION = 4
+
+# Label used for pixels of blank and unrevealed cells
+BACKGROUND = 0
+
+
+def calibration_key():
+    """Fingerprint of everything the calibrated table depends on"""
+    settings = (sorted(color_map.items()), LUT_BITS, PATCH_RADIUS,
+                CALIBRATION_CELL_SIZES, CALIBRATION_BOARDS, CALIBRATION_VERSION)
+    return hashlib.sha1(repr(settings).encode()).hexdigest()
+
+
+def count_labelled_pixels(histogram, image, organized_cells, labels):
+    """Add one frame's centre-patch pixels to a (9, bins) per-label histogram.
+
+    `labels` gives the tile shown by each cell: 0-8 for revealed cells and
+    higher values for unrevealed, flagged or bomb tiles. Unrevealed cells
+    count as background; flags and bombs are skipped.
+    """
+    cx, cy, present = cell_centres(organized_cells)
+    patches, inside = gather_patches(image, cx, cy)
+    labels = np.asarray(labels).ravel()
+    keep = inside & present.ravel() & (labels < TILE_FLAGGED)
+    cell_labels = np.where(labels[keep] > 8, BACKGROUND, labels[keep]).astype(np.intp)
+    indices = lut_index(patches[keep]).reshape(len(cell_labels), -1)
+    bins = histogram.shape[1]
+    histogram += np.bincount((indices + cell_labels[:, None] * bins).ravel(),
+                             minlength=histogram.size).reshape(histogram.shape)
+    return histogram
+
+
+def window_cells(game):
+    """Organized cells of a game's buttons, in coordinates of its window"""
+    root = game.root
+    x0, y0 = root.winfo_rootx(), root.winfo_rooty()
+    return [[(btn.winfo_rootx() - x0, btn.winfo_rooty() - y0, btn.winfo_width(), btn.winfo_height())
+             for btn in row] for row in game.buttons]
+
+
+def live_frames(seed=0):
+    """Yield (image, organized_cells, labels) captured from real gui.py game windows.
+
+    Each calibration board is opened as a MinesweeperGame, grabbed closed and
+    again with every safe cell revealed; the labels come from the game's
+    engine and the cell rectangles from its buttons. Needs a display.
+    """
+    rng = random.Random(seed)
+    for rows, cols, num_bombs in CALIBRATION_BOARDS:
+        game = gui.MinesweeperGame(rows, cols, num_bombs, seed=rng.getrandbits(64))
+        try:
+            capture = TkWindowCapture(game.root, settle_delay=0.5)
+            frame, _ = capture.grab()
+            if frame is None:
+                raise RuntimeError(f"Could not capture the {rows}x{cols} calibration window")
+            yield frame, window_cells(game), tile_state(game.engine)
+            for r, c in np.argwhere(~game.engine.mines).tolist():
+                if not game.engine.revealed[r, c]:
+                    game.click(r, c)
+            # A won game disables its buttons, which greys out the digits
+            for row in game.buttons:
+                for btn in row:
+                    btn.config(state=tk.NORMAL)
+            frame, _ = capture.grab()
+            if frame is None:
+                raise RuntimeError(f"Could not capture the {rows}x{cols} calibration window")
+            yield frame, window_cells(game), tile_state(game.engine)
+        finally:
+            game.close()
+
+
+def live_calibration_available():
+    """Whether a Tk window can be opened and captured here"""
+    try:
+        import pyautogui  # TkWindowCapture grabs the screen with it
+        root = tk.Tk()
+    except Exception:
+        return False
+    root.destroy()
+    return True
+
+
+def rendered_frames(seed=0):
+    """Yield (image, organized_cells, labels) for frames drawn with gui.color_map.
+
+    The fallback when no display is available: the renderer approximates
+    the Tk widgets, so a table calibrated from live_frames() is preferred.
+    """
+    rng = random.Random(seed)
+    for rows, cols, num_bombs in CALIBRATION_BOARDS:
+        for cell_size in CALIBRATION_CELL_SIZES:
+            engine = MinesweeperEngine(rows, cols, num_bombs, seed=rng.getrandbits(64))
+            renderer = VirtualFrameRenderer(engine, cell_size=cell_size)
+            grid = [[renderer.cell_rect(r, c) for c in range(cols)] for r in range(rows)]
+            # A closed board teaches the button face as background
+            frame, _ = renderer.grab()
+            yield frame, grid, renderer.tile_state()
+            # Open every safe cell so all digits on the board are shown
+            for r, c in np.argwhere(~engine.mines).tolist():
+                if not engine.revealed[r, c]:
+                    engine.reveal(r, c)
+            frame, _ = renderer.grab()
+            yield frame, grid, renderer.tile_state()
+
+
+def calibrate(frames):
+    """Build a digit LUT from labelled frames.
+
+    Each observed colour bin takes the label it was seen with most often;
+    bins never observed keep the label compiled from the hand-tuned ranges.
+    """
+    bins = 1 << (3 * LUT_BITS)
+    histogram = np.zeros((9, bins), dtype=np.int64)
+    for image, organized_cells, labels in frames:
+        count_labelled_pixels(histogram, image, organized_cells, labels)
+
+    lut = build_range_lut(board_vision.COLOR_RANGES)
+    seen = histogram.sum(axis=0) > 0
+    lut[seen] = histogram[:, seen].argmax(axis=0)
+    return lut
+
+
+def calibrate_live_or_rendered():
+    """Return (lut, source), calibrating from live game windows when possible"""
+    if live_calibration_available():
+        try:
+            return calibrate(live_frames()), "live"
+        except Exception as e:
+            print(f"Live calibration failed ({e}), using rendered frames")
+    else:
+        print("No display for live calibration, using rendered frames")
+    return calibrate(rendered_frames()), "rendered"
+
+
+def load_or_calibrate(path=LUT_PATH, install=True):
+    """Load the cached digit LUT, recalibrating it when missing or stale.
+
+    A table calibrated from rendered frames is only kept while live
+    calibration stays unavailable. With install set the table is also used
+    by board_vision from now on.
+    """
+    key = calibration_key()
+    lut = None
+    if os.path.exists(path):
+        try:
+            with np.load(path) as cached:
+                if str(cached["key"]) == key:
+                    if str(cached["source"]) == "live" or not live_calibration_available():
+                        lut = cached["lut"]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Could not read digit LUT from {path}: {e}")
+    if lut is None:
+        print("Calibrating digit colour LUT...")
+        lut, source = calibrate_live_or_rendered()
+        np.savez_compressed(path, lut=lut, key=key, source=source)
+        print(f"Saved digit LUT calibrated from {source} frames to {path}")
+    if install:
+        board_vision.set_digit_lut(lut)
+    return lut
+
+
+if __name__ == "__main__":
+    if os.path.exists(LUT_PATH):
+        os.remove(LUT_PATH)
+    load_or_calibrate()
@@ -0,0 +1,112 @@
+import os
+import queue
+import threading
+from datetime import datetime
+
+import cv2
+
+# Sampling modes
+OFF = "off"  # Never write anything
+ALL = "all"  # Write every image
+EVERY_N = "every_n"  # Every Nth frame, plus all game-end and error images
+GAME_END = "game_end"  # Only images saved when a game ends
+ERRORS = "errors"  # Only images saved after an error
+
+MODES = (OFF, ALL, EVERY_N, GAME_END, ERRORS)
+
+# Events a caller can attach to an image
+FRAME = "frame"
+GAME_END_EVENT = "game_end"
+ERROR_EVENT = "error"
+
+
+def _discard(*args, **kwargs):
+    return None
+
+
+class DebugImageSink:
+    """Write debug images from a background thread.
+
+    save() only decides whether to keep the image and puts a copy on a bounded
+    queue; PNG encoding and disk I/O happen on the worker thread. When the
+    queue is full the image is dropped rather than blocking the caller. In
+    OFF mode save() is replaced by a no-op and no thread is started.
+    """
+
+    def __init__(self, directory, mode=ALL, every_n=10, max_queue=16):
+        if mode not in MODES:
+            raise ValueError(f"Unknown debug mode {mode!r}, expected one of {MODES}")
+        self.directory = directory
+        self.mode = mode
+        self.every_n = max(1, every_n)
+        self.frames = 0
+        self.written = 0
+        self.dropped = 0
+        self.enabled = mode != OFF
+        self._queue = None
+        self._thread = None
+
+        if not self.enabled:
+            self.save = _discard
+            return
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._worker, name="debug-image-writer", daemon=True)
+        self._thread.start()
+
+    def wants(self, event=FRAME):
+        """Whether an image for this event would be kept under the current mode"""
+        if self.mode == ALL:
+            return True
+        if self.mode == EVERY_N:
+            return event != FRAME or self.frames % self.every_n == 0
+        if self.mode == GAME_END:
+            return event == GAME_END_EVENT
+        if self.mode == ERRORS:
+            return event == ERROR_EVENT
+        return False
+
+    def save(self, img, name_prefix, event=FRAME):
+        """Queue an image for writing and return its filename, or None if skipped"""
+        keep = self.wants(event)
+        if event == FRAME:
+            self.frames += 1
+        if not keep or img is None:
+            return None
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = os.path.join(self.directory, f"{name_prefix}_{timestamp}_{self.frames}.png")
+        try:
+            # Copy so the caller can keep reusing its buffer
+            self._queue.put_nowait((filename, img.copy()))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        return filename
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                filename, img = item
+                cv2.imwrite(filename, img)
+                self.written += 1
+            except Exception as e:
+                print(f"Could not write debug image: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued image has been written"""
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write out the remaining images and stop the worker thread"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        print(f"Debug images: {self.written} written, {self.dropped} dropped")
@@ -0,0 +1,210 @@
+import random
+from enum import IntEnum
+from functools import lru_cache
+import numpy as np
+
+from layouts import generate_layout, free_cells, ANY
+
+# Observation codes shared by the engine, the bots and the vision code.
+# Revealed cells use their adjacent mine count (0-8).
+UNREVEALED = 9
+FLAGGED = 10
+
+
+class GameStatus(IntEnum):
+    PLAYING = 0
+    WON = 1
+    LOST = 2
+
+
+PLAYING, WON, LOST = GameStatus.PLAYING, GameStatus.WON, GameStatus.LOST
+
+# Moves as recorded in replay logs
+REVEAL = 0
+FLAG = 1
+
+
+def new_seed():
+    """Fresh 64-bit game seed, drawn from the module-level RNG"""
+    return random.getrandbits(64)
+
+
+def adjacent_counts(mines):
+    """Count the mines around every cell in one pass over the board.
+
+    Works on a single (rows, cols) board or a stack of boards with any number
+    of leading dimensions. This is the 3x3 box convolution of the mine mask
+    (minus the centre), computed as a sum of eight shifted views of a padded
+    copy instead of looping over neighbours.
+    """
+    mines = np.asarray(mines, dtype=np.uint8)
+    pad = [(0, 0)] * (mines.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mines, pad)
+    rows, cols = mines.shape[-2:]
+    counts = np.zeros(mines.shape, dtype=np.uint8)
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            if dr == 1 and dc == 1:
+                continue
+            counts += padded[..., dr:dr + rows, dc:dc + cols]
+    return counts
+
+
+@lru_cache(maxsize=None)
+def neighbour_offsets(cols):
+    """Flat index offsets of the 8 neighbours in a board padded by one cell"""
+    width = cols + 2
+    return np.array([-width - 1, -width, -width + 1, -1, 1,
+                     width - 1, width, width + 1], dtype=np.intp)
+
+
+class MinesweeperEngine:
+    """Headless Minesweeper game state and rules, independent of any UI.
+
+    State is kept in compact arrays: `mines`, `revealed` and `flags` are
+    one-byte boolean masks, `counts` is uint8 and `status` is a GameStatus.
+    Every randomly placed layout comes from an explicit `seed`, so the same
+    seed always gives the same game. With `first_click` set to layouts.SAFE
+    or layouts.OPENING, seeded mines are placed on the first reveal so that
+    click is safe (or opens a region). If `log` is set (see
+    replay.ReplayLog), each seeded game and every move that changes the
+    board is recorded.
+    """
+
+    def __init__(self, rows=10, cols=10, num_bombs=15, bomb_locations=None, seed=None, log=None,
+                 first_click=ANY):
+        self.rows = rows
+        self.cols = cols
+        self.num_bombs = num_bombs
+        self.first_click = first_click
+        self.log = log
+        self.reset(bomb_locations, seed)
+
+    def reset(self, bomb_locations=None, seed=None):
+        """Start a new game from a bomb layout, or from a seed (a fresh one if None)"""
+        self.seed = None
+        self._placement_pending = False
+        mines = np.zeros((self.rows, self.cols), dtype=bool)
+        if bomb_locations is not None:
+            for r, c in bomb_locations:
+                mines[r, c] = True
+            self.num_bombs = int(mines.sum())
+        else:
+            self.seed = new_seed() if seed is None else seed
+            # Fail here rather than inside the first reveal when placement is deferred
+            available = free_cells(self.rows, self.cols, self.first_click)
+            if self.num_bombs > available:
+                raise ValueError(f"Cannot place {self.num_bombs} mines on a {self.rows}x{self.cols} board "
+                                 f"with first-click mode {self.first_click!r}; at most {available} fit")
+            if self.first_click == ANY:
+                mines = generate_layout(self.rows, self.cols, self.num_bombs, rng=self.seed)
+            else:
+                self._placement_pending = True
+        self._place(mines)
+
+        # Revealed and flag masks live inside a one-cell border so the flood
+        # fill can step to neighbours by flat offset without bounds checks.
+        # The border counts as revealed, which stops the fill at the edges.
+        padded = (self.rows + 2, self.cols + 2)
+        self._revealed_pad = np.ones(padded, dtype=bool)
+        self._revealed_pad[1:-1, 1:-1] = False
+        self._flags_pad = np.zeros(padded, dtype=bool)
+        self.revealed = self._revealed_pad[1:-1, 1:-1]
+        self.flags = self._flags_pad[1:-1, 1:-1]
+        self.revealed_cells = 0
+        self.status = PLAYING
+        # Only seeded games can be replayed, so games from explicit layouts log nothing
+        self._logging = self.log is not None and self.seed is not None
+        if self._logging:
+            self.log.start_game(self)
+
+    def _place(self, mines):
+        self.mines = mines
+        self.counts = adjacent_counts(mines)
+        self._zero_pad = np.zeros((self.rows + 2, self.cols + 2), dtype=bool)
+        self._zero_pad[1:-1, 1:-1] = self.counts == 0
+
+    @property
+    def bomb_locations(self):
+        """Set of (row, col) bomb positions"""
+        return {(int(r), int(c)) for r, c in zip(*np.nonzero(self.mines))}
+
+    @property
+    def game_over(self):
+        return self.status != PLAYING
+
+    def reveal(self, r, c):
+        """Reveal a cell and return the newly revealed cells as a (k, 2) array.
+
+        Revealing a zero cell opens the surrounding region. Clicking a bomb
+        ends the game; the clicked cell is still returned so a UI can draw it.
+        """
+        if self.game_over or self.revealed[r, c] or self.flags[r, c]:
+            return np.empty((0, 2), dtype=np.intp)
+
+        if self._placement_pending:
+            self._place(generate_layout(self.rows, self.cols, self.num_bombs, (r, c),
+                                        self.first_click, rng=self.seed))
+            self._placement_pending = False
+
+        if self.mines[r, c]:
+            self.status = LOST
+            if self._logging:
+                self.log.record_move(REVEAL, r, c, 1, self.status)
+            return np.array([[r, c]], dtype=np.intp)
+
+        width = self.cols + 2
+        start = (r + 1) * width + (c + 1)
+        opened = self._flood_fill(start)
+
+        self.revealed_cells += len(opened)
+        if self.revealed_cells == self.rows * self.cols - self.num_bombs:
+            self.status = WON
+        if self._logging:
+            self.log.record_move(REVEAL, r, c, len(opened), self.status)
+        pr, pc = np.divmod(opened, width)
+        return np.stack([pr - 1, pc - 1], axis=1)
+
+    def _flood_fill(self, start):
+        """Reveal from a padded flat index, returning all padded indices opened.
+
+        Works breadth-first one wave at a time: every zero cell in the current
+        wave adds its eight neighbours through the cached offset table, so the
+        Python-level loop runs once per wave rather than once per cell and
+        there is no recursion regardless of board size.
+        """
+        revealed = self._revealed_pad.reshape(-1)
+        blocked = self._flags_pad.reshape(-1)
+        zero = self._zero_pad.reshape(-1)
+        offsets = neighbour_offsets(self.cols)
+
+        revealed[start] = True
+        wave = np.array([start], dtype=np.intp)
+        opened = [wave]
+        while True:
+            wave = wave[zero[wave]]
+            if wave.size == 0:
+                break
+            candidates = (wave[:, None] + offsets).ravel()
+            candidates = candidates[~revealed[candidates] & ~blocked[candidates]]
+            if candidates.size == 0:
+                break
+            wave = np.unique(candidates)
+            revealed[wave] = True
+            opened.append(wave)
+        return np.concatenate(opened)
+
+    def toggle_flag(self, r, c):
+        """Flag or unflag an unrevealed cell, returning the new flag state"""
+        if self.game_over or self.revealed[r, c]:
+            return bool(self.flags[r, c])
+        self.flags[r, c] = not self.flags[r, c]
+        if self._logging:
+            self.log.record_move(FLAG, r, c, int(self.flags[r, c]), self.status)
+        return bool(self.flags[r, c])
+
+    def observation(self):
+        """Board as seen by a player: counts for revealed cells, codes otherwise"""
+        obs = np.where(self.revealed, self.counts, UNREVEALED).astype(np.uint8)
+        obs[self.flags & ~self.revealed] = FLAGGED
+        return obs
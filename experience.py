@@ -0,0 +1,213 @@
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# A sampled minibatch; every field is an array with one entry per transition
+Batch = namedtuple("Batch", "obs actions rewards next_obs dones indices weights")
+
+META_FILE = "meta.json"
+
+
+class SumTree:
+    """Binary tree of priority sums over a fixed number of leaves.
+
+    Stored as one flat array with the root at index 1 and leaf i at
+    `size + i`. Updates walk one path to the root; sampling descends all
+    queries together, one vectorized step per tree level.
+    """
+
+    def __init__(self, capacity):
+        self.size = 1
+        while self.size < capacity:
+            self.size *= 2
+        self.tree = np.zeros(2 * self.size, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def set(self, index, value):
+        """Set one leaf without allocating"""
+        node = self.size + index
+        tree = self.tree
+        tree[node] = value
+        node //= 2
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node //= 2
+
+    def set_many(self, indices, values):
+        """Set many leaves, then refresh their ancestors one level at a time"""
+        nodes = np.asarray(indices, dtype=np.intp) + self.size
+        self.tree[nodes] = values
+        while True:
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+
+    def rebuild(self, leaves):
+        """Recompute the whole tree from an array of leaf values"""
+        self.tree[:] = 0
+        self.tree[self.size:self.size + len(leaves)] = leaves
+        start = self.size
+        while start > 1:
+            parents = np.arange(start // 2, start)
+            self.tree[parents] = self.tree[2 * parents] + self.tree[2 * parents + 1]
+            start //= 2
+
+    def find(self, targets):
+        """Leaf index holding each cumulative-sum target in [0, total)"""
+        nodes = np.ones(len(targets), dtype=np.intp)
+        targets = np.array(targets, dtype=np.float64)
+        while nodes[0] < self.size:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = targets >= left_sum
+            targets -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+        return nodes - self.size
+
+
+class ReplayBuffer:
+    """Fixed-capacity ring buffer of (obs, action, reward, next_obs, done) transitions.
+
+    All storage is allocated up front, so add() only writes into existing
+    arrays and costs O(1); once full the oldest transitions are overwritten.
+    With `directory` set the arrays are np.memmap files there, and after
+    flush() the buffer (including its write position) is reopened by the
+    next ReplayBuffer on the same directory. With `prioritized` set, transitions also carry
+    priorities in a sum tree for proportional sampling.
+    """
+
+    def __init__(self, capacity, obs_shape, obs_dtype=np.uint8, directory=None,
+                 prioritized=False, alpha=0.6, seed=None):
+        self.capacity = capacity
+        self.obs_shape = tuple(obs_shape)
+        self.directory = directory
+        self.alpha = alpha
+        self.rng = np.random.default_rng(seed)
+        self.pos = 0
+        self.size = 0
+
+        fields = {
+            "obs": ((capacity,) + self.obs_shape, obs_dtype),
+            "actions": ((capacity,), np.int32),
+            "rewards": ((capacity,), np.float32),
+            "next_obs": ((capacity,) + self.obs_shape, obs_dtype),
+            "dones": ((capacity,), np.bool_),
+            "priorities": ((capacity,), np.float32),
+        }
+        if directory is not None:
+            self._open_files(fields)
+        else:
+            for name, (shape, dtype) in fields.items():
+                setattr(self, name, np.zeros(shape, dtype=dtype))
+
+        self.tree = None
+        self.max_priority = 1.0
+        if prioritized:
+            self.tree = SumTree(capacity)
+            if self.size:
+                self.max_priority = float(self.priorities[:self.size].max())
+                self.tree.rebuild(self.priorities[:self.size].astype(np.float64) ** alpha)
+
+    def _open_files(self, fields):
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path = os.path.join(self.directory, META_FILE)
+        meta = None
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["capacity"] != self.capacity or tuple(meta["obs_shape"]) != self.obs_shape:
+                raise ValueError(f"Replay buffer in {self.directory} has capacity {meta['capacity']} "
+                                 f"and observation shape {tuple(meta['obs_shape'])}")
+            self.pos, self.size = meta["pos"], meta["size"]
+        for name, (shape, dtype) in fields.items():
+            path = os.path.join(self.directory, f"{name}.npy")
+            mode = "r+" if meta is not None and os.path.exists(path) else "w+"
+            setattr(self, name, np.lib.format.open_memmap(path, mode=mode, dtype=dtype, shape=shape))
+
+    def __len__(self):
+        return self.size
+
+    def add(self, obs, action, reward, next_obs, done, priority=None):
+        """Store one transition, overwriting the oldest once full"""
+        i = self.pos
+        self.obs[i] = obs
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_obs[i] = next_obs
+        self.dones[i] = done
+        if priority is None:
+            priority = self.max_priority
+        self.priorities[i] = priority
+        if self.tree is not None:
+            self.max_priority = max(self.max_priority, priority)
+            self.tree.set(i, priority ** self.alpha)
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, obs, actions, rewards, next_obs, dones, priorities=None):
+        """Store a batch of transitions, e.g. one step of BatchedMinesweeperEnv"""
+        n = len(actions)
+        if n > self.capacity:
+            raise ValueError(f"Batch of {n} transitions exceeds capacity {self.capacity}")
+        indices = (self.pos + np.arange(n)) % self.capacity
+        self.obs[indices] = obs
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.next_obs[indices] = next_obs
+        self.dones[indices] = dones
+        if priorities is None:
+            priorities = self.max_priority
+        self.priorities[indices] = priorities
+        if self.tree is not None:
+            self.max_priority = max(self.max_priority, float(np.max(priorities)))
+            self.tree.set_many(indices, np.asarray(priorities, dtype=np.float64) ** self.alpha)
+        self.pos = int((self.pos + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+
+    def sample(self, batch_size, prioritized=False, beta=0.4):
+        """Draw a minibatch uniformly, or in proportion to priority.
+
+        Prioritized batches carry importance-sampling weights normalized to a
+        maximum of 1; uniform batches have weights of 1.
+        """
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        if prioritized:
+            if self.tree is None:
+                raise ValueError("Buffer was created without prioritized=True")
+            total = self.tree.total
+            targets = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+            indices = np.minimum(self.tree.find(targets), self.size - 1)
+            probabilities = self.tree.tree[self.tree.size + indices] / total
+            weights = (self.size * probabilities) ** -beta
+            weights = (weights / weights.max()).astype(np.float32)
+        else:
+            indices = self.rng.integers(0, self.size, batch_size)
+            weights = np.ones(batch_size, dtype=np.float32)
+        return Batch(self.obs[indices], self.actions[indices], self.rewards[indices],
+                     self.next_obs[indices], self.dones[indices], indices, weights)
+
+    def update_priorities(self, indices, priorities):
+        """Set new priorities for sampled transitions, e.g. their TD errors"""
+        priorities = np.asarray(priorities, dtype=np.float32)
+        self.priorities[indices] = priorities
+        if self.tree is not None:
+            self.max_priority = max(self.max_priority, float(priorities.max()))
+            self.tree.set_many(indices, priorities.astype(np.float64) ** self.alpha)
+
+    def flush(self):
+        """Write memory-mapped arrays and the write position to disk"""
+        if self.directory is None:
+            return
+        for name in ("obs", "actions", "rewards", "next_obs", "dones", "priorities"):
+            getattr(self, name).flush()
+        meta = {"capacity": self.capacity, "obs_shape": list(self.obs_shape),
+                "pos": self.pos, "size": self.size}
+        with open(os.path.join(self.directory, META_FILE), "w") as f:
+            json.dump(meta, f)
@@ -0,0 +1,60 @@
+import zlib
+import numpy as np
+
+
+def grid_checksum(image, organized_cells):
+    """Cheap checksum of the pixels along the grid lines of the organized cells.
+
+    Only one pixel row per board row and one pixel column per board column
+    (the top and left edges of the cells) are read, so this costs a tiny
+    fraction of re-running detection.
+    """
+    ys = sorted({y for row in organized_cells for _, y, _, _ in row})
+    xs = sorted({x for row in organized_cells for x, _, _, _ in row})
+    height, width = image.shape[:2]
+    ys = [y for y in ys if 0 <= y < height]
+    xs = [x for x in xs if 0 <= x < width]
+    checksum = zlib.crc32(np.ascontiguousarray(image[ys, :]).tobytes())
+    return zlib.crc32(np.ascontiguousarray(image[:, xs]).tobytes(), checksum)
+
+
+class GridGeometryCache:
+    """Remember organized cell rectangles between games.
+
+    Entries are keyed on the window position and size and the board
+    dimensions. A cached grid is only reused while the pixels along its grid
+    lines still match the checksum taken when it was stored, which catches
+    layout changes the window geometry alone would miss.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.organized_cells = None
+        self.checksum = None
+
+    def has_entry(self):
+        return self.organized_cells is not None
+
+    def invalidate(self):
+        self.key = None
+        self.organized_cells = None
+        self.checksum = None
+
+    def lookup(self, window_rect, board_dims, image):
+        """Return the cached grid for this window and image, or None"""
+        if self.organized_cells is None:
+            return None
+        if (tuple(window_rect), tuple(board_dims)) != self.key:
+            print("Window moved or resized, grid geometry cache invalidated")
+            self.invalidate()
+            return None
+        if grid_checksum(image, self.organized_cells) != self.checksum:
+            print("Grid lines changed, grid geometry cache invalidated")
+            self.invalidate()
+            return None
+        return self.organized_cells
+
+    def store(self, window_rect, board_dims, image, organized_cells):
+        self.key = (tuple(window_rect), tuple(board_dims))
+        self.organized_cells = organized_cells
+        self.checksum = grid_checksum(image, organized_cells)
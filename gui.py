@@ -1,123 +1,267 @@
+import argparse
 import tkinter as tk
-import random
+from engine import MinesweeperEngine, PLAYING, WON, LOST
+from layouts import ANY, FIRST_CLICK_MODES, bombs_for_density
+from canvas_view import CanvasBoardView
 
-# Global variables
+# Default settings and the game opened by create_game(). The engine's arrays
+# are the source of truth for the game state; the buttons and label only
+# mirror them.
 rows, cols = 10, 10
 buttons = []
 revealed_cells = 0
 bomb_locations = set()
 root = None
 label = None
+engine = None
+game = None  # MinesweeperGame opened by create_game()
+canvas_view = None  # Set instead of buttons when using the canvas renderer
 num_bombs = 15
+replay_log = None  # replay.ReplayLog that records every game, if set
+
+STATUS_TEXT = {
+    PLAYING: "Welcome to Minesweeper!",
+    WON: "You Win!",
+    LOST: "Game Over!"
+}
+
+color_map = {
+    1: "blue",
+    2: "green",
+    3: "red",
+    4: "purple",
+    5: "maroon",
+    6: "turquoise",
+    7: "black",
+    8: "gray"
+}
+
+class MinesweeperGame:
+    """One game: an engine plus, unless headless, the window that shows it.
+
+    Every game keeps its own widgets and state, so one process can host any
+    number of them. Windowed games open their own tk.Tk root, or a
+    tk.Toplevel of `master` when several games share one Tk interpreter.
+    The "buttons" renderer creates one tk.Button per cell; the "canvas"
+    renderer draws the whole board on one canvas and is meant for large
+    boards. Headless games have no widgets and are played through click()
+    and toggle_flag() alone.
+    """
+
+    def __init__(self, rows=10, cols=10, num_bombs=15, seed=None, log=None, first_click=ANY,
+                 renderer="buttons", cell_size=24, headless=False, master=None, title="Sample Game"):
+        self.engine = MinesweeperEngine(rows, cols, num_bombs, seed=seed, log=log, first_click=first_click)
+        self.rows = rows
+        self.cols = cols
+        self.root = None
+        self.label = None
+        self.buttons = []
+        self.canvas_view = None  # Set instead of buttons when using the canvas renderer
+        if headless:
+            return
+
+        self.root = tk.Tk() if master is None else tk.Toplevel(master)
+        self.root.title(title)
+        if renderer == "canvas":
+            self.canvas_view = CanvasBoardView(self.root, self.engine, color_map, cell_size=cell_size,
+                                               on_status_change=self.on_status_change)
+            self.canvas_view.pack()
+        else:
+            frame = tk.Frame(self.root)
+            frame.pack()
+            for r in range(rows):
+                row = []
+                for c in range(cols):
+                    btn = tk.Button(frame, width=4, height=2, command=lambda r=r, c=c: self.click(r, c))
+                    btn.grid(row=r+1, column=c)  # Shift all buttons down by 1 row
+                    btn.bind("<Button-3>", lambda event, r=r, c=c: self.on_right_click(event, r, c))
+                    row.append(btn)
+                self.buttons.append(row)
+            self.button_font = self.buttons[0][0].cget("font") if self.buttons else None
+
+        self.label = tk.Label(self.root, text=STATUS_TEXT[PLAYING])
+        self.label.pack()
+
+    @property
+    def headless(self):
+        return self.root is None
+
+    @property
+    def revealed_cells(self):
+        return self.engine.revealed_cells
+
+    @property
+    def bomb_locations(self):
+        return self.engine.bomb_locations
+
+    def reset(self, seed=None):
+        """Start a new game on the same board and widgets"""
+        self.engine.reset(seed=seed)
+        if self.canvas_view is not None:
+            self.canvas_view.draw_board()
+        for row in self.buttons:
+            for btn in row:
+                # Digits shrink their button; restore the size and font it was created with
+                btn.config(text="", fg="black", relief=tk.RAISED, bg="SystemButtonFace", state=tk.NORMAL,
+                           width=4, height=2, font=self.button_font)
+        if self.label is not None:
+            self.label.config(text=STATUS_TEXT[PLAYING])
+
+    def close(self):
+        if self.root is not None:
+            self.root.destroy()
+            self.root = None
+
+    def show_all_bombs(self):
+        for r, c in self.engine.bomb_locations:
+            self.buttons[r][c].config(text="💣")
+
+    def disable_all_buttons(self):
+        for row in self.buttons:
+            for btn in row:
+                btn.config(state=tk.DISABLED)
+
+    def toggle_flag(self, r, c):
+        """Flag or unflag an unrevealed cell and return its new flag state"""
+        if self.canvas_view is not None:
+            self.canvas_view.toggle_flag(r, c)
+            return bool(self.engine.flags[r, c])
+        if self.engine.revealed[r, c]:
+            return False
+        flagged = self.engine.toggle_flag(r, c)
+        if self.buttons:
+            if flagged:
+                self.buttons[r][c].config(text="🚩", bg="yellow")
+            else:
+                self.buttons[r][c].config(text="", bg="SystemButtonFace")
+        return flagged
+
+    def on_right_click(self, event, r, c):
+        self.toggle_flag(r, c)
+        return "break"  # Prevents the default right-click context menu from appearing in some Tkinter environments
+
+    def draw_revealed_cells(self, cells):
+        """Update the buttons for a batch of newly revealed cells"""
+        for r, c in cells.tolist():
+            count = int(self.engine.counts[r, c])
+            if count > 0:
+                self.buttons[r][c].config(
+                    text=str(count),
+                    fg=color_map.get(count, "black"),
+                    font=("Arial", 14, "bold"),
+                    width=2,  # Fixed width to prevent resizing
+                    height=1  # Fixed height to prevent resizing
+                )
+            else:
+                self.buttons[r][c].config(text="", relief=tk.SUNKEN, bg="#d3d3d3")
+
+    def on_status_change(self, status):
+        self.label.config(text=STATUS_TEXT[status])
+
+    def click(self, r, c):
+        """Reveal a cell and update the window, if any"""
+        if self.canvas_view is not None:
+            self.canvas_view.click(r, c)
+            return
+        if self.engine.flags[r, c]:
+            return
+
+        newly_revealed = self.engine.reveal(r, c)
+        if not self.buttons:
+            return
+
+        if self.engine.status == LOST:
+            self.buttons[r][c].config(text="💣")
+            self.on_status_change(LOST)
+            self.show_all_bombs()
+            self.disable_all_buttons()
+            return
+
+        self.draw_revealed_cells(newly_revealed)
+
+        if self.engine.status == WON:
+            self.on_status_change(WON)
+            self.show_all_bombs()
+            self.disable_all_buttons()
+
+
+# Module-level interface to the most recent game opened by create_game()
 
 def show_all_bombs():
-    for r, c in bomb_locations:
-        buttons[r][c].config(text="💣")
+    game.show_all_bombs()
+
+def disable_all_buttons():
+    game.disable_all_buttons()
 
 def on_right_click(event, r, c):
-    if buttons[r][c]['relief'] != tk.SUNKEN and buttons[r][c]['text'] not in ["1", "2", "3", "4", "5", "6", "7", "8"]:
-        if buttons[r][c]['text'] == "🚩":
-            buttons[r][c].config(text="", bg="SystemButtonFace")
-        else:
-            buttons[r][c].config(text="🚩", bg="yellow")
-    return "break"  # Prevents the default right-click context menu from appearing in some Tkinter environments
+    return game.on_right_click(event, r, c)
+
+def draw_revealed_cells(cells):
+    game.draw_revealed_cells(cells)
+
+def on_canvas_status_change(status):
+    game.on_status_change(status)
 
 def on_click(r, c):
     global revealed_cells
-    if buttons[r][c]['text'] == "🚩":
-        return
-
-    if (r, c) in bomb_locations:
-        buttons[r][c].config(text="💣")
-        label.config(text="Game Over!")
-        show_all_bombs()
-        # Disable all buttons
-        for row in buttons:
-            for btn in row:
-                btn.config(state=tk.DISABLED)
-    else:
-        revealed_cells += 1
-        # Count bombs in adjacent cells
-        count = 0
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < rows and 0 <= nc < cols and (nr, nc) in bomb_locations:
-                    count += 1
-        color_map = {
-            1: "blue",
-            2: "green",
-            3: "red",
-            4: "purple",
-            5: "maroon",
-            6: "turquoise",
-            7: "black",
-            8: "gray"
-        }
-        if count > 0:
-            buttons[r][c].config(
-                text=str(count),
-                fg=color_map.get(count, "black"),
-                font=("Arial", 14, "bold"),
-                width=2,  # Fixed width to prevent resizing
-                height=1  # Fixed height to prevent resizing
-            )
-        else:
-            buttons[r][c].config(text="")
-        if count == 0:
-            buttons[r][c].config(relief=tk.SUNKEN, bg="#d3d3d3")
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    if dr == 0 and dc == 0:
-                        continue
-                    nr, nc = r + dr, c + dc
-                    if 0 <= nr < rows and 0 <= nc < cols:
-                        if buttons[nr][nc]['text'] == "" and buttons[nr][nc]['relief'] != tk.SUNKEN:
-                            on_click(nr, nc)
-    if revealed_cells == (rows * cols) - num_bombs:
-        label.config(text="You Win!")
-        show_all_bombs()
-        # Disable all buttons
-        for row in buttons:
-            for btn in row:
-                btn.config(state=tk.DISABLED)    
-
-def create_game():
-    global root, buttons, revealed_cells, label, bomb_locations
-    
-    root = tk.Tk()
-    root.title("Sample Game")
-    
-    buttons = []
+    game.click(r, c)
+    revealed_cells = game.revealed_cells
+
+def create_game(board_rows=None, board_cols=None, bombs=None, renderer="buttons", cell_size=24, seed=None,
+                density=None, first_click=ANY):
+    """Open a game window and return its Tk root.
+
+    Board size and bomb count default to the module settings; `density`
+    sets the bomb count as a fraction of the cells instead. The bombs are
+    placed from `seed` (a fresh one if None), and `first_click` (see
+    layouts.FIRST_CLICK_MODES) decides whether the first click is safe.
+    The new game also replaces the module-level `game`, `engine`, `buttons`,
+    `label` and `root`; create MinesweeperGame directly to run several.
+    """
+    global game, root, buttons, revealed_cells, label, bomb_locations, engine, canvas_view
+    global rows, cols, num_bombs
+    rows = board_rows or rows
+    cols = board_cols or cols
+    num_bombs = bombs if bombs is not None else num_bombs
+    if density is not None:
+        num_bombs = bombs_for_density(rows, cols, density)
+
+    game = MinesweeperGame(rows, cols, num_bombs, seed=seed, log=replay_log, first_click=first_click,
+                           renderer=renderer, cell_size=cell_size)
+    print(f"Game seed: {game.engine.seed}")
+    root, buttons, label = game.root, game.buttons, game.label
+    engine, canvas_view = game.engine, game.canvas_view
     revealed_cells = 0
-    frame = tk.Frame(root)
-    frame.pack()
-    
-    # Create buttons
-    for r in range(rows):
-        row = []
-        for c in range(cols):
-            btn = tk.Button(frame, width=4, height=2, command=lambda r=r, c=c: on_click(r, c))
-            btn.grid(row=r+1, column=c)  # Shift all buttons down by 1 row
-            btn.bind("<Button-3>", lambda event, r=r, c=c: on_right_click(event, r, c))
-            row.append(btn)
-        buttons.append(row)
-    
-    label = tk.Label(root, text="Welcome to Minesweeper!")
-    label.pack()
-    
-    # Place bombs
-    bomb_locations = set()
-    while len(bomb_locations) < num_bombs:
-        r = random.randint(0, rows - 1)
-        c = random.randint(0, cols - 1)
-        bomb_locations.add((r, c))
-    
+    bomb_locations = engine.bomb_locations
     return root
 
 # Only create the game when run directly
 if __name__ == "__main__":
-    game = create_game()
-    game.mainloop()
+    parser = argparse.ArgumentParser(description="Play Minesweeper")
+    parser.add_argument("--rows", type=int, default=rows)
+    parser.add_argument("--cols", type=int, default=cols)
+    parser.add_argument("--bombs", type=int, default=num_bombs)
+    parser.add_argument("--density", type=float, help="Fraction of cells holding bombs, instead of --bombs")
+    parser.add_argument("--first-click", choices=FIRST_CLICK_MODES, default=ANY,
+                        help="Keep the first click safe, or make it open a region")
+    parser.add_argument("--canvas", action="store_true", help="Draw the board on a single canvas")
+    parser.add_argument("--seed", type=int, help="Seed for the bomb layout")
+    parser.add_argument("--replay-log", help="Append the game to this replay log")
+    args = parser.parse_args()
+
+    if args.replay_log:
+        from replay import ReplayLog
+        replay_log = ReplayLog(args.replay_log)
+
+    try:
+        game_root = create_game(args.rows, args.cols, args.bombs, renderer="canvas" if args.canvas else "buttons",
+                                seed=args.seed, density=args.density, first_click=args.first_click)
+    except ValueError as e:
+        if replay_log is not None:
+            replay_log.close()
+        parser.error(str(e))
+    try:
+        game_root.mainloop()
+    finally:
+        if replay_log is not None:
+            replay_log.close()
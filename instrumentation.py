@@ -0,0 +1,139 @@
+import atexit
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Stages timed in the bot loop
+CAPTURE = "capture"
+DETECTION = "detection"
+CLASSIFICATION = "classification"
+DECISION = "decision"
+CLICK = "click"
+UI_WAIT = "ui_wait"
+
+
+def summarize(samples):
+    """p50/p95/p99, mean and max of a sequence of seconds, reported in milliseconds"""
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(ms.max()),
+    }
+
+
+class LatencyRecorder:
+    """Rolling per-stage latency samples, overall and per game.
+
+    Each stage keeps its last `window` samples; the last `max_games` games
+    keep their own samples too. Use `with recorder.stage(name):` around the
+    work to time it.
+    """
+
+    def __init__(self, window=2000, max_games=20):
+        self.window = window
+        self.max_games = max_games
+        self.stages = {}
+        self.games = OrderedDict()
+        self.current_game = None
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start_game(self, game_id):
+        """Attribute subsequent samples to a new game"""
+        with self._lock:
+            self.current_game = game_id
+            self.games[game_id] = {}
+            while len(self.games) > self.max_games:
+                self.games.popitem(last=False)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.stages.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            if self.current_game is not None:
+                self.games[self.current_game].setdefault(name, []).append(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self):
+        """Percentile summary per stage and per recent game"""
+        with self._lock:
+            stages = {name: list(samples) for name, samples in self.stages.items()}
+            games = {game: {name: list(samples) for name, samples in game_stages.items()}
+                     for game, game_stages in self.games.items()}
+        return {
+            "stages": {name: summarize(samples) for name, samples in stages.items()},
+            "games": {str(game): {name: summarize(samples) for name, samples in game_stages.items()}
+                      for game, game_stages in games.items()},
+        }
+
+    def format_text(self):
+        """Plain-text table of the overall per-stage percentiles"""
+        lines = [f"{'stage':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total s':>10}"]
+        with self._lock:
+            totals = {name: sum(samples) for name, samples in self.stages.items()}
+        for name, summary in sorted(self.report()["stages"].items(), key=lambda kv: -totals[kv[0]]):
+            if summary["count"]:
+                lines.append(f"{name:<16}{summary['count']:>8}{summary['p50_ms']:>10.2f}"
+                             f"{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}{totals[name]:>10.2f}")
+        return "\n".join(lines)
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"Saved latency metrics to {path}")
+
+    def dump_on_exit(self, path):
+        """Write the JSON report when the process exits"""
+        atexit.register(self.dump_json, path)
+
+    def serve(self, port=8765, host="127.0.0.1"):
+        """Serve the text report at / and the JSON report at /json on a local port"""
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") == "/json":
+                    body, content_type = json.dumps(recorder.report(), indent=2), "application/json"
+                else:
+                    body, content_type = recorder.format_text() + "\n", "text/plain"
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Keep request logs out of the bot's console output
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="latency-endpoint", daemon=True).start()
+        print(f"Latency metrics at http://{host}:{port}/")
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+# Shared recorder used by the bot loop and capture backends
+recorder = LatencyRecorder()
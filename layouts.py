@@ -0,0 +1,78 @@
+import numpy as np
+
+# First-click policies for generated layouts
+ANY = "any"  # The first click may hit a mine
+SAFE = "safe"  # The first clicked cell is never a mine
+OPENING = "opening"  # The first clicked cell and its neighbours are mine-free, so it opens a region
+FIRST_CLICK_MODES = (ANY, SAFE, OPENING)
+
+
+def bombs_for_density(rows, cols, density):
+    """Number of mines that gives a board the requested mine density"""
+    if not 0.0 <= density <= 1.0:
+        raise ValueError(f"Mine density must be between 0 and 1, got {density}")
+    return int(round(density * rows * cols))
+
+
+def free_cells(rows, cols, mode=ANY):
+    """Cells that can hold mines whatever the first click is, under a first-click mode"""
+    if mode == ANY:
+        return rows * cols
+    if mode == SAFE:
+        return rows * cols - 1
+    return rows * cols - min(rows, 3) * min(cols, 3)
+
+
+def excluded_cells(rows, cols, first_clicks, mode):
+    """(count, rows * cols) mask of cells that must stay mine-free for each first click"""
+    first_clicks = np.asarray(first_clicks, dtype=np.intp).reshape(-1, 2)
+    count = len(first_clicks)
+    excluded = np.zeros((count, rows * cols), dtype=bool)
+    if mode == ANY:
+        return excluded
+    r, c = first_clicks[:, 0], first_clicks[:, 1]
+    reach = 1 if mode == OPENING else 0
+    layouts = np.arange(count)
+    for dr in range(-reach, reach + 1):
+        for dc in range(-reach, reach + 1):
+            rr, cc = r + dr, c + dc
+            valid = (rr >= 0) & (rr < rows) & (cc >= 0) & (cc < cols)
+            excluded[layouts[valid], rr[valid] * cols + cc[valid]] = True
+    return excluded
+
+
+def generate_layouts(count, rows, cols, num_bombs, first_click=None, mode=ANY, rng=None):
+    """Draw `count` mine layouts as a (count, rows, cols) bool array in one vectorized pass.
+
+    Each layout takes the `num_bombs` cells with the smallest random keys,
+    i.e. a uniform sample without replacement, so the cost does not depend
+    on the mine density. With mode SAFE or OPENING, `first_click` gives one
+    (row, col) for all layouts or one per layout, and the excluded cells get
+    keys that are never picked. `rng` is a numpy Generator or a seed.
+    """
+    if mode not in FIRST_CLICK_MODES:
+        raise ValueError(f"Unknown first-click mode {mode!r}, expected one of {FIRST_CLICK_MODES}")
+    rng = np.random.default_rng(rng)
+    cells = rows * cols
+    keys = rng.random((count, cells))
+
+    available = np.full(count, cells)
+    if mode != ANY:
+        if first_click is None:
+            raise ValueError(f"First-click mode {mode!r} needs the first click")
+        excluded = excluded_cells(rows, cols, np.broadcast_to(first_click, (count, 2)), mode)
+        keys[excluded] = 2.0  # Above every random key
+        available = cells - excluded.sum(axis=1)
+    if num_bombs > available.min(initial=cells):
+        raise ValueError(f"Cannot place {num_bombs} mines in {available.min()} free cells")
+
+    mines = np.zeros((count, cells), dtype=bool)
+    if num_bombs:
+        picks = np.argpartition(keys, num_bombs - 1, axis=1)[:, :num_bombs]
+        np.put_along_axis(mines, picks, True, axis=1)
+    return mines.reshape(count, rows, cols)
+
+
+def generate_layout(rows, cols, num_bombs, first_click=None, mode=ANY, rng=None):
+    """A single (rows, cols) layout; see generate_layouts()"""
+    return generate_layouts(1, rows, cols, num_bombs, first_click, mode, rng)[0]
@@ -0,0 +1,419 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from engine import MinesweeperEngine, UNREVEALED, FLAGGED, WON
+
+# Code for neighbourhood cells that fall outside the board
+OUTSIDE = 11
+
+# Marks a free slot in the hash table. Inner neighbours are packed as 4-bit
+# codes of at most OUTSIDE, so no real key has every bit set.
+EMPTY_KEY = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Fibonacci hashing multiplier
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# 2-bit class of each code for the outer ring of a 5x5 pattern:
+# 0 unrevealed or flagged, 1 revealed zero, 2 revealed number, 3 outside
+RING_CLASS = np.array([1, 2, 2, 2, 2, 2, 2, 2, 2, 0, 0, 3], dtype=np.uint64)
+
+
+class PatternHashTable:
+    """Open-addressing hash table from packed pattern keys to mine statistics.
+
+    Keys live in one uint64 array and are found by linear probing; every
+    slot also counts how often its pattern was seen and how often the
+    centre cell was a mine. All operations take arrays of keys and probe
+    them together. The table doubles once it is half full.
+    """
+
+    def __init__(self, capacity_log2=16):
+        self._allocate(capacity_log2)
+
+    def _allocate(self, capacity_log2):
+        self.capacity_log2 = capacity_log2
+        self.capacity = 1 << capacity_log2
+        self.keys = np.full(self.capacity, EMPTY_KEY, dtype=np.uint64)
+        self.visits = np.zeros(self.capacity, dtype=np.uint32)
+        self.mines = np.zeros(self.capacity, dtype=np.uint32)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _home_slots(self, keys):
+        shift = np.uint64(64 - self.capacity_log2)
+        return ((keys * HASH_MULTIPLIER) >> shift).astype(np.intp)
+
+    def lookup(self, keys):
+        """Slot of every key, or -1 for keys not in the table"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        slots = self._home_slots(keys)
+        result = np.full(len(keys), -1, dtype=np.intp)
+        pending = np.arange(len(keys))
+        mask = self.capacity - 1
+        while pending.size:
+            stored = self.keys[slots[pending]]
+            found = stored == keys[pending]
+            result[pending[found]] = slots[pending[found]]
+            # Keep probing past occupied slots holding other keys
+            pending = pending[~found & (stored != EMPTY_KEY)]
+            slots[pending] = (slots[pending] + 1) & mask
+        return result
+
+    def _find_or_insert(self, keys):
+        """Slot of every key in a batch of distinct keys, inserting missing ones"""
+        if (self.count + len(keys)) * 2 > self.capacity:
+            self._grow(self.count + len(keys))
+        slots = self._home_slots(keys)
+        result = np.empty(len(keys), dtype=np.intp)
+        pending = np.arange(len(keys))
+        mask = self.capacity - 1
+        while pending.size:
+            probe = slots[pending]
+            stored = self.keys[probe]
+            found = stored == keys[pending]
+            result[pending[found]] = probe[found]
+
+            # Keys reaching the same free slot together: the first one claims it
+            free = stored == EMPTY_KEY
+            free_slots, first = np.unique(probe[free], return_index=True)
+            winners = pending[free][first]
+            self.keys[free_slots] = keys[winners]
+            result[winners] = free_slots
+            self.count += len(winners)
+
+            # Losers re-check their slot next round, others move on
+            done = found.copy()
+            done[np.flatnonzero(free)[first]] = True
+            move_on = ~found & ~free
+            slots[pending[move_on]] = (probe[move_on] + 1) & mask
+            pending = pending[~done]
+        return result
+
+    def _grow(self, needed):
+        old_keys, old_visits, old_mines = self.keys, self.visits, self.mines
+        capacity_log2 = self.capacity_log2
+        while (1 << capacity_log2) < needed * 2:
+            capacity_log2 += 1
+        self._allocate(capacity_log2 + 1)
+        used = old_keys != EMPTY_KEY
+        slots = self._find_or_insert(old_keys[used])
+        self.visits[slots] = old_visits[used]
+        self.mines[slots] = old_mines[used]
+
+    def add(self, keys, is_mine):
+        """Count one observation per key, with whether its centre was a mine"""
+        unique, inverse = np.unique(np.asarray(keys, dtype=np.uint64), return_inverse=True)
+        slots = self._find_or_insert(unique)
+        self.visits[slots] += np.bincount(inverse, minlength=len(unique)).astype(np.uint32)
+        self.mines[slots] += np.bincount(inverse, weights=is_mine, minlength=len(unique)).astype(np.uint32)
+
+    def mine_probability(self, keys, prior, prior_weight=1.0):
+        """Estimated chance the centre is a mine, shrunk towards `prior` for rare keys"""
+        slots = self.lookup(keys)
+        known = slots >= 0
+        visits = np.where(known, self.visits[slots], 0)
+        mines = np.where(known, self.mines[slots], 0)
+        return (mines + prior * prior_weight) / (visits + prior_weight)
+
+    def to_arrays(self):
+        """(keys, visits, mines) of every stored pattern"""
+        used = self.keys != EMPTY_KEY
+        return self.keys[used], self.visits[used], self.mines[used]
+
+    @classmethod
+    def from_arrays(cls, keys, visits, mines):
+        table = cls()
+        slots = table._find_or_insert(np.asarray(keys, dtype=np.uint64))
+        table.visits[slots] = visits
+        table.mines[slots] = mines
+        return table
+
+
+class PatternBoard:
+    """Padded board of codes plus the frontier of unrevealed cells next to revealed ones.
+
+    Cells are addressed by flat index into the board padded by two cells of
+    OUTSIDE. reveal() only touches the given cells and their neighbours, so
+    keeping the frontier up to date costs nothing per untouched cell.
+    `changed` collects the frontier cells whose pattern changed since it was
+    last cleared.
+    """
+
+    PAD = 2
+
+    def __init__(self, rows, cols, pattern_size=5):
+        if pattern_size not in (3, 5):
+            raise ValueError("pattern_size must be 3 or 5")
+        self.rows = rows
+        self.cols = cols
+        self.pattern_size = pattern_size
+        self.width = cols + 2 * self.PAD
+        ring = [(dr, dc) for dr in range(-2, 3) for dc in range(-2, 3) if max(abs(dr), abs(dc)) == 2]
+        inner = [(dr, dc) for dr in range(-1, 2) for dc in range(-1, 2) if (dr, dc) != (0, 0)]
+        self.inner_offsets = np.array([dr * self.width + dc for dr, dc in inner], dtype=np.intp)
+        self.ring_offsets = np.array([dr * self.width + dc for dr, dc in ring], dtype=np.intp)
+        self.inner_shifts = np.arange(8, dtype=np.uint64) * np.uint64(4)
+        self.ring_shifts = np.uint64(32) + np.arange(16, dtype=np.uint64) * np.uint64(2)
+        self.pattern_offsets = self.inner_offsets
+        if pattern_size == 5:
+            self.pattern_offsets = np.concatenate([self.inner_offsets, self.ring_offsets])
+        self.reset()
+
+    def reset(self):
+        self.codes = np.full((self.rows + 2 * self.PAD, self.width), OUTSIDE, dtype=np.uint8)
+        self.codes[self.PAD:-self.PAD, self.PAD:-self.PAD] = UNREVEALED
+        self.flat = self.codes.reshape(-1)
+        self.frontier = set()
+        self.changed = set()
+
+    @property
+    def board(self):
+        """Unpadded view of the codes"""
+        return self.codes[self.PAD:-self.PAD, self.PAD:-self.PAD]
+
+    def index(self, r, c):
+        return (np.asarray(r) + self.PAD) * self.width + np.asarray(c) + self.PAD
+
+    def cell(self, index):
+        r, c = np.divmod(index, self.width)
+        return r - self.PAD, c - self.PAD
+
+    def reveal(self, cells, values):
+        """Write codes for a (k, 2) array of cells that were just revealed"""
+        if len(cells) == 0:
+            return
+        idx = self.index(cells[:, 0], cells[:, 1])
+        self.flat[idx] = values
+        self.frontier.difference_update(idx.tolist())
+        neighbours = (idx[:, None] + self.inner_offsets).ravel()
+        neighbours = neighbours[self.flat[neighbours] == UNREVEALED]
+        self.frontier.update(neighbours.tolist())
+        # Frontier cells whose pattern window holds a revealed cell
+        nearby = np.unique((idx[:, None] + self.pattern_offsets).ravel()).tolist()
+        self.changed.update(self.frontier.intersection(nearby))
+
+    def sync(self, board):
+        """Catch up with a full board of codes, e.g. a vision result.
+
+        Newly revealed cells go through reveal(); newly flagged cells are
+        marked and dropped from the frontier.
+        """
+        board = np.asarray(board)
+        changed = np.argwhere((board != self.board) & (board < UNREVEALED))
+        self.reveal(changed, board[changed[:, 0], changed[:, 1]])
+        flagged = np.argwhere((board == FLAGGED) & (self.board == UNREVEALED))
+        if len(flagged):
+            idx = self.index(flagged[:, 0], flagged[:, 1])
+            self.flat[idx] = FLAGGED
+            self.frontier.difference_update(idx.tolist())
+            self.changed.difference_update(idx.tolist())
+
+    def frontier_indices(self):
+        return np.fromiter(self.frontier, dtype=np.intp, count=len(self.frontier))
+
+    def keys(self, idx):
+        """Packed pattern keys for each padded flat index, from 3x3 up to pattern_size.
+
+        Returns a list with the 3x3 keys and, for 5x5 patterns, the 5x5 keys.
+        """
+        inner = self.flat[idx[:, None] + self.inner_offsets].astype(np.uint64)
+        keys = np.bitwise_or.reduce(inner << self.inner_shifts, axis=1)
+        if self.pattern_size == 3:
+            return [keys]
+        ring = RING_CLASS[self.flat[idx[:, None] + self.ring_offsets]]
+        return [keys, keys | np.bitwise_or.reduce(ring << self.ring_shifts, axis=1)]
+
+
+class PatternAgent:
+    """Pick clicks from learned mine probabilities of local patterns.
+
+    Every frontier cell is scored by looking up its packed neighbourhood
+    keys in PatternHashTables, one per pattern size: the 3x3 estimate is
+    shrunk towards the remaining mine density and the 5x5 estimate towards
+    the 3x3 one, so rarely seen large patterns fall back on the small ones.
+    Cells away from the frontier are scored with the density. Training
+    labels frontier cells with the true layout whenever their pattern
+    changes (counting a cell again for an unchanged pattern would only
+    repeat the same evidence) and queues the (key, mine) pairs, flushing
+    them to the tables in batches.
+    """
+
+    def __init__(self, rows, cols, num_bombs, pattern_size=5, tables=None, batch_size=1 << 16,
+                 prior_weight=2.0, seed=None):
+        self.rows = rows
+        self.cols = cols
+        self.num_bombs = num_bombs
+        self.board = PatternBoard(rows, cols, pattern_size)
+        levels = 1 if pattern_size == 3 else 2
+        self.tables = tables if tables is not None else [PatternHashTable() for _ in range(levels)]
+        if len(self.tables) != levels:
+            raise ValueError(f"Expected {levels} pattern tables for {pattern_size}x{pattern_size} patterns")
+        self.prior_weight = prior_weight
+        self.rng = random.Random(seed)
+        self._pending_keys = np.empty((levels, batch_size), dtype=np.uint64)
+        self._pending_mines = np.empty(batch_size, dtype=np.float64)
+        self._pending = 0
+        self.reset()
+
+    def save(self, path):
+        """Write the learned tables to an .npz file"""
+        arrays = {"pattern_size": self.board.pattern_size}
+        for level, table in enumerate(self.tables):
+            for name, values in zip(("keys", "visits", "mines"), table.to_arrays()):
+                arrays[f"{name}_{level}"] = values
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path, rows, cols, num_bombs, **kwargs):
+        """Agent for the given board using tables saved by save()"""
+        with np.load(path) as data:
+            pattern_size = int(data["pattern_size"])
+            levels = 1 if pattern_size == 3 else 2
+            tables = [PatternHashTable.from_arrays(data[f"keys_{level}"], data[f"visits_{level}"],
+                                                   data[f"mines_{level}"]) for level in range(levels)]
+        return cls(rows, cols, num_bombs, pattern_size, tables=tables, **kwargs)
+
+    def reset(self):
+        self.board.reset()
+        self.unknown = self.rows * self.cols
+
+    def observe(self, cells, values):
+        """Tell the agent which cells a click revealed"""
+        self.board.reveal(cells, values)
+        self.unknown -= len(cells)
+
+    def sync(self, board):
+        """Catch up with a full board of codes, e.g. from the vision code"""
+        self.board.sync(board)
+        self.unknown = int((self.board.board == UNREVEALED).sum())
+
+    def mine_probability(self, idx, density):
+        """Estimated mine probability of the cells at padded flat indices"""
+        probabilities = density
+        for table, keys in zip(self.tables, self.board.keys(idx)):
+            probabilities = table.mine_probability(keys, probabilities, self.prior_weight)
+        return probabilities
+
+    def choose(self, mines_left=None):
+        """Return (row, col, mine_probability) of the safest-looking cell"""
+        if mines_left is None:
+            mines_left = self.num_bombs
+        density = mines_left / max(self.unknown, 1)
+        idx = self.board.frontier_indices()
+        if idx.size:
+            probabilities = self.mine_probability(idx, density)
+            best = int(probabilities.argmin())
+            if probabilities[best] <= density or self.unknown <= idx.size:
+                r, c = self.board.cell(idx[best])
+                return int(r), int(c), float(probabilities[best])
+        return self._random_interior() + (density,)
+
+    def _random_interior(self):
+        """A random unrevealed cell off the frontier, or any unrevealed cell"""
+        board = self.board.board
+        for _ in range(64):
+            r, c = self.rng.randrange(self.rows), self.rng.randrange(self.cols)
+            if board[r, c] == UNREVEALED and int(self.board.index(r, c)) not in self.board.frontier:
+                return r, c
+        hidden = np.argwhere(board == UNREVEALED)
+        r, c = hidden[self.rng.randrange(len(hidden))]
+        return int(r), int(c)
+
+    def learn(self, mines):
+        """Queue a label from the true mine layout for each frontier cell with a new pattern"""
+        changed = self.board.changed
+        idx = np.fromiter(changed, dtype=np.intp, count=len(changed))
+        changed.clear()
+        if idx.size == 0:
+            return
+        r, c = self.board.cell(idx)
+        keys = np.stack(self.board.keys(idx))
+        labels = mines[r, c]
+        capacity = len(self._pending_mines)
+        start = 0
+        while start < len(labels):
+            take = min(capacity - self._pending, len(labels) - start)
+            end = self._pending + take
+            self._pending_keys[:, self._pending:end] = keys[:, start:start + take]
+            self._pending_mines[self._pending:end] = labels[start:start + take]
+            self._pending = end
+            start += take
+            if self._pending == capacity:
+                self.flush()
+
+    def flush(self):
+        """Apply queued labels to the tables"""
+        if self._pending:
+            for table, keys in zip(self.tables, self._pending_keys):
+                table.add(keys[:self._pending], self._pending_mines[:self._pending])
+            self._pending = 0
+
+
+def play_game(agent, engine, seed=None, learn=False):
+    """Play one game on the engine with the agent, optionally learning from it"""
+    engine.reset(seed=seed)
+    agent.reset()
+    steps = 0
+    while not engine.game_over:
+        if learn:
+            agent.learn(engine.mines)
+        r, c, _ = agent.choose()
+        opened = engine.reveal(r, c)
+        steps += 1
+        if not engine.game_over:
+            agent.observe(opened, engine.counts[opened[:, 0], opened[:, 1]])
+    return engine.status == WON, steps
+
+
+def train_agent(num_games, rows=9, cols=9, num_bombs=10, pattern_size=5, seed=0, agent=None):
+    """Train an agent headlessly and return (agent, stats)"""
+    rng = random.Random(seed)
+    if agent is None:
+        agent = PatternAgent(rows, cols, num_bombs, pattern_size, seed=rng.getrandbits(64))
+    engine = MinesweeperEngine(rows, cols, num_bombs, seed=rng.getrandbits(64))
+    stats = {"games": 0, "wins": 0, "steps": 0}
+    start = time.perf_counter()
+    for _ in range(num_games):
+        won, steps = play_game(agent, engine, rng.getrandbits(64), learn=True)
+        stats["games"] += 1
+        stats["wins"] += won
+        stats["steps"] += steps
+    agent.flush()
+    stats["elapsed"] = time.perf_counter() - start
+    stats["patterns"] = sum(len(table) for table in agent.tables)
+    return agent, stats
+
+
+def evaluate_agent(agent, num_games, seed=1):
+    """Win rate of the agent without learning"""
+    rng = random.Random(seed)
+    engine = MinesweeperEngine(agent.rows, agent.cols, agent.num_bombs, seed=rng.getrandbits(64))
+    wins = sum(play_game(agent, engine, rng.getrandbits(64))[0] for _ in range(num_games))
+    return wins / num_games
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the pattern agent headlessly")
+    parser.add_argument("--games", type=int, default=20000)
+    parser.add_argument("--eval-games", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--bombs", type=int, default=15)
+    parser.add_argument("--pattern-size", type=int, choices=(3, 5), default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="pattern_table.npz", help="Where to save the learned table")
+    args = parser.parse_args()
+
+    agent, stats = train_agent(args.games, args.rows, args.cols, args.bombs, args.pattern_size, args.seed)
+    rate = stats["steps"] / stats["elapsed"]
+    print(f"Trained on {stats['games']} games ({stats['steps']} steps) in {stats['elapsed']:.1f}s: "
+          f"{rate:.0f} steps/s, {rate * 3600 / 1e6:.1f}M steps/hour, {stats['patterns']} patterns")
+    print(f"Training win rate: {stats['wins'] / stats['games']:.1%}")
+    print(f"Evaluation win rate: {evaluate_agent(agent, args.eval_games):.1%}")
+    agent.save(args.output)
+    print(f"Saved pattern table to {args.output}")
@@ -0,0 +1,245 @@
+from collections import deque
+from math import lgamma
+
+import numpy as np
+
+# Transfer states a component may need before it is estimated instead
+MAX_STATES = 4096
+
+
+def split_components(constraints):
+    """Group (unknowns, remaining) constraints into independent components.
+
+    Two constraints belong together when they share an unknown cell.
+    Returns a list of (cells, constraints) pairs.
+    """
+    parent = {}
+
+    def find(cell):
+        root = cell
+        while parent[root] != root:
+            root = parent[root]
+        while parent[cell] != root:
+            parent[cell], cell = root, parent[cell]
+        return root
+
+    for unknowns, _ in constraints:
+        cells = iter(unknowns)
+        first = next(cells)
+        parent.setdefault(first, first)
+        for cell in cells:
+            parent.setdefault(cell, cell)
+            a, b = find(first), find(cell)
+            if a != b:
+                parent[b] = a
+
+    groups = {}
+    for unknowns, remaining in constraints:
+        cells, members = groups.setdefault(find(next(iter(unknowns))), (set(), []))
+        cells.update(unknowns)
+        members.append((unknowns, remaining))
+    return list(groups.values())
+
+
+def _cell_order(cells, constraints):
+    """Breadth-first order through shared constraints, so each constraint stays open briefly"""
+    touching = {}
+    for i, (unknowns, _) in enumerate(constraints):
+        for cell in unknowns:
+            touching.setdefault(cell, []).append(i)
+    order, seen = [], set()
+    for start in sorted(cells):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            order.append(cell)
+            for i in touching[cell]:
+                for other in sorted(constraints[i][0]):
+                    if other not in seen:
+                        seen.add(other)
+                        queue.append(other)
+    return order
+
+
+def enumerate_component(cells, constraints, max_states=MAX_STATES):
+    """Count every mine assignment of a component that satisfies its constraints.
+
+    Cells are assigned one at a time while the partial assignments are
+    merged by the mines each still-open constraint needs, so the work grows
+    with the frontier's width rather than exponentially with its length.
+    Returns (cells, counts, mine_counts) where counts[k] is the number of
+    assignments with k mines and mine_counts[k, i] how many of those put a
+    mine on cells[i] (both scaled by a common factor), or None when more
+    than `max_states` partial states are needed.
+    """
+    order = _cell_order(cells, constraints)
+    position = {cell: i for i, cell in enumerate(order)}
+    n = len(order)
+
+    members = [[] for _ in range(n)]  # constraints containing each position
+    opens = [[] for _ in range(n)]  # constraints whose first cell is each position
+    needs = []
+    after = []  # after[j][i]: cells of constraint j beyond position i
+    for j, (unknowns, remaining) in enumerate(constraints):
+        positions = sorted(position[cell] for cell in unknowns)
+        for p in positions:
+            members[p].append(j)
+        opens[positions[0]].append(j)
+        needs.append(remaining)
+        beyond = np.zeros(n, dtype=np.intp)
+        for k, p in enumerate(positions):
+            beyond[p:] = len(positions) - k - 1
+        after.append(beyond)
+
+    states = {(): (np.eye(1, n + 1)[0], np.zeros((n + 1, n)))}
+    for i in range(n):
+        updated = {}
+        inside = set(members[i])
+        for state, (counts, mine_counts) in states.items():
+            open_needs = dict(state)
+            for j in opens[i]:
+                open_needs[j] = needs[j]
+            for is_mine in (0, 1):
+                key = []
+                for j, need in open_needs.items():
+                    if j in inside:
+                        need -= is_mine
+                    left = after[j][i]
+                    if need < 0 or need > left:
+                        break
+                    if left:
+                        key.append((j, need))
+                else:
+                    key = tuple(sorted(key))
+                    if is_mine:
+                        new_counts = np.zeros_like(counts)
+                        new_counts[1:] = counts[:-1]
+                        new_mines = np.zeros_like(mine_counts)
+                        new_mines[1:] = mine_counts[:-1]
+                        new_mines[:, i] += new_counts
+                    else:
+                        new_counts, new_mines = counts, mine_counts
+                    if key in updated:
+                        updated[key][0][:] += new_counts
+                        updated[key][1][:] += new_mines
+                    else:
+                        updated[key] = (new_counts.copy(), new_mines.copy())
+        if len(updated) > max_states:
+            return None
+        states = updated
+
+    if () not in states:
+        return order, np.zeros(n + 1), np.zeros((n + 1, n))
+    counts, mine_counts = states[()]
+    scale = counts.max()
+    if scale > 0:
+        counts, mine_counts = counts / scale, mine_counts / scale
+    return order, counts, mine_counts
+
+
+def _convolve_all(distributions):
+    total = np.ones(1)
+    for distribution in distributions:
+        total = np.convolve(total, distribution)
+    return total
+
+
+class FrontierProbabilities:
+    """Exact mine probabilities for the frontier, memoized per component.
+
+    The frontier is split into independent components, each enumerated
+    exactly by enumerate_component(). Components are tied together by the
+    number of mines left: a split that leaves m mines for the I cells off
+    the frontier is weighted by C(I, m). A component's enumeration is
+    reused for as long as its constraints stay the same, so after a reveal
+    only the components it touched are enumerated again.
+    """
+
+    def __init__(self, max_states=MAX_STATES):
+        self.max_states = max_states
+        self.cache = {}
+        self.enumerated = 0  # Components enumerated since the last reset, for profiling
+
+    def reset(self):
+        self.cache.clear()
+        self.enumerated = 0
+
+    def _component(self, cells, constraints):
+        signature = frozenset((frozenset(unknowns), remaining) for unknowns, remaining in constraints)
+        if signature not in self.cache:
+            self.cache[signature] = enumerate_component(cells, constraints, self.max_states)
+            self.enumerated += 1
+        return signature, self.cache[signature]
+
+    def compute(self, constraints, interior, mines_left=None):
+        """Return ({cell: probability}, interior probability) for the given constraints.
+
+        `constraints` are (unknowns, remaining) pairs over undetermined cells,
+        `interior` the number of unknown cells outside every constraint and
+        `mines_left` the mines not yet located, if known.
+        """
+        constraints = [(unknowns, remaining) for unknowns, remaining in constraints if unknowns]
+        results, signatures, rough = [], set(), []
+        for cells, members in split_components(constraints):
+            signature, result = self._component(cells, members)
+            signatures.add(signature)
+            if result is None or result[1].sum() == 0:
+                rough.extend(members)  # Too wide to enumerate, or contradictory
+            else:
+                results.append(result)
+        # Forget components that are gone, keeping the cache as small as the frontier
+        for signature in list(self.cache):
+            if signature not in signatures:
+                del self.cache[signature]
+
+        probabilities = {}
+        for unknowns, remaining in rough:
+            ratio = remaining / len(unknowns)
+            for cell in unknowns:
+                probabilities[cell] = max(probabilities.get(cell, 0.0), ratio)
+
+        distributions = [counts for _, counts, _ in results]
+        weights = None
+        if mines_left is not None:
+            # C(interior, mines_left - K) for every total K of enumerated frontier mines
+            totals = np.arange(sum(len(d) - 1 for d in distributions) + 1)
+            off_frontier = mines_left - sum(probabilities.values()) - totals
+            valid = (off_frontier >= -1e-9) & (off_frontier <= interior + 1e-9)
+            if valid.any():
+                m = np.clip(off_frontier, 0, interior)
+                log_weights = np.array([lgamma(interior + 1) - lgamma(x + 1) - lgamma(interior - x + 1) for x in m])
+                log_weights[~valid] = -np.inf
+                weights = np.exp(log_weights - log_weights[valid].max())
+                total_weight = _convolve_all(distributions) @ weights
+                if total_weight <= 0:
+                    weights = None
+
+        if weights is None:
+            # No usable mine total: components are independent
+            for cells, counts, mine_counts in results:
+                cell_probabilities = mine_counts.sum(axis=0) / counts.sum()
+                probabilities.update(zip(cells, cell_probabilities.tolist()))
+            if probabilities:
+                density = sum(probabilities.values()) / len(probabilities)
+            else:
+                density = 0.5
+            if mines_left is not None and interior > 0:
+                left = mines_left - sum(probabilities.values())
+                density = min(max(left / interior, 0.0), 1.0)
+            return probabilities, density
+
+        for j, (cells, counts, mine_counts) in enumerate(results):
+            others = _convolve_all(distributions[:j] + distributions[j + 1:])
+            # Weight of each mine count k of this component, summed over the others
+            component_weights = np.array([others @ weights[k:k + len(others)] for k in range(len(counts))])
+            cell_probabilities = component_weights @ mine_counts / total_weight
+            probabilities.update(zip(cells, np.clip(cell_probabilities, 0.0, 1.0).tolist()))
+
+        density = 0.0
+        if interior > 0:
+            expected = (_convolve_all(distributions) * weights) @ off_frontier / total_weight
+            density = min(max(expected / interior, 0.0), 1.0)
+        return probabilities, density
@@ -0,0 +1,186 @@
+import argparse
+import os
+import struct
+import time
+from collections import namedtuple
+
+from engine import MinesweeperEngine, REVEAL, FLAG, WON, LOST, GameStatus
+from layouts import FIRST_CLICK_MODES
+
+# File layout: a header, then tagged little-endian records appended in play
+# order. A game record starts a game and is followed by its move records.
+MAGIC = b"MSRL\x02"
+GAME_RECORD = struct.Struct("<cQHHIB")  # b"G", seed, rows, cols, num_bombs, first-click mode
+MOVE_RECORD = struct.Struct("<cHHIB")  # b"R"/b"F", row, col, outcome, status after
+GAME_TAG = b"G"
+MOVE_TAGS = {b"R": REVEAL, b"F": FLAG}
+TAG_FOR_ACTION = {REVEAL: b"R", FLAG: b"F"}
+
+# outcome is the number of cells opened by a reveal, or the new flag state
+Move = namedtuple("Move", "action row col outcome status")
+RecordedGame = namedtuple("RecordedGame", "index seed rows cols num_bombs first_click moves")
+Mismatch = namedtuple("Mismatch", "game move expected actual")
+
+
+class ReplayLog:
+    """Append-only binary log of seeded games and their moves.
+
+    Attach it to an engine with MinesweeperEngine(..., log=ReplayLog(path))
+    and every game started from a seed is recorded as it is played. Records
+    are buffered and written when the buffer fills, on flush() and on close().
+    """
+
+    def __init__(self, path, buffer_size=1 << 16):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"{path} is not a replay log")
+        self._file = open(path, "ab", buffering=buffer_size)
+        if new_file:
+            self._file.write(MAGIC)
+        self.games = 0
+        self.moves = 0
+
+    def start_game(self, engine):
+        self._file.write(GAME_RECORD.pack(GAME_TAG, engine.seed, engine.rows, engine.cols, engine.num_bombs,
+                                          FIRST_CLICK_MODES.index(engine.first_click)))
+        self.games += 1
+
+    def record_move(self, action, r, c, outcome, status):
+        self._file.write(MOVE_RECORD.pack(TAG_FOR_ACTION[action], r, c, outcome, status))
+        self.moves += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_games(path):
+    """Yield every RecordedGame in a log, ignoring a truncated final record"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a replay log")
+
+    pos, end = len(MAGIC), len(data)
+    game = None
+    index = 0
+    while pos < end:
+        tag = data[pos:pos + 1]
+        if tag == GAME_TAG:
+            if pos + GAME_RECORD.size > end:
+                break
+            if game is not None:
+                yield game
+            _, seed, rows, cols, num_bombs, mode = GAME_RECORD.unpack_from(data, pos)
+            game = RecordedGame(index, seed, rows, cols, num_bombs, FIRST_CLICK_MODES[mode], [])
+            index += 1
+            pos += GAME_RECORD.size
+        elif tag in MOVE_TAGS:
+            if pos + MOVE_RECORD.size > end:
+                break
+            _, r, c, outcome, status = MOVE_RECORD.unpack_from(data, pos)
+            if game is not None:
+                game.moves.append(Move(MOVE_TAGS[tag], r, c, outcome, status))
+            pos += MOVE_RECORD.size
+        else:
+            raise ValueError(f"Corrupt replay log {path} at byte {pos}")
+    if game is not None:
+        yield game
+
+
+def replay_game(game, engine=None, on_move=None):
+    """Re-run a recorded game headlessly and return (engine, mismatches).
+
+    A mismatch is any move whose outcome or resulting status differs from
+    the recording. `engine` is reused when its board size matches, and
+    `on_move(engine, move)` is called after every move.
+    """
+    if engine is None or (engine.rows, engine.cols) != (game.rows, game.cols):
+        engine = MinesweeperEngine(game.rows, game.cols, game.num_bombs, seed=game.seed,
+                                   first_click=game.first_click)
+    else:
+        engine.num_bombs = game.num_bombs
+        engine.first_click = game.first_click
+        engine.reset(seed=game.seed)
+
+    mismatches = []
+    for i, move in enumerate(game.moves):
+        if move.action == REVEAL:
+            outcome = len(engine.reveal(move.row, move.col))
+        else:
+            outcome = int(engine.toggle_flag(move.row, move.col))
+        if (outcome, engine.status) != (move.outcome, move.status):
+            mismatches.append(Mismatch(game.index, i, (move.outcome, GameStatus(move.status)),
+                                       (outcome, engine.status)))
+        if on_move is not None:
+            on_move(engine, move)
+    return engine, mismatches
+
+
+def replay_log(path, limit=None):
+    """Replay every game in a log and return a summary with any mismatches"""
+    summary = {"games": 0, "moves": 0, "wins": 0, "losses": 0, "unfinished": 0, "mismatches": []}
+    engine = None
+    start = time.perf_counter()
+    for game in read_games(path):
+        if limit is not None and summary["games"] >= limit:
+            break
+        engine, mismatches = replay_game(game, engine)
+        summary["games"] += 1
+        summary["moves"] += len(game.moves)
+        if engine.status == WON:
+            summary["wins"] += 1
+        elif engine.status == LOST:
+            summary["losses"] += 1
+        else:
+            summary["unfinished"] += 1
+        summary["mismatches"] += mismatches
+    summary["elapsed"] = time.perf_counter() - start
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay games recorded in a binary replay log")
+    parser.add_argument("path", help="Replay log to read")
+    parser.add_argument("--game", type=int, help="Replay only this game, printing every move")
+    parser.add_argument("--limit", type=int, help="Stop after this many games")
+    args = parser.parse_args()
+
+    if args.game is not None:
+        from board_vision import board_to_strings
+
+        game = next((g for g in read_games(args.path) if g.index == args.game), None)
+        if game is None:
+            raise SystemExit(f"No game {args.game} in {args.path}")
+        print(f"Game {game.index}: seed={game.seed} {game.rows}x{game.cols} with {game.num_bombs} bombs "
+              f"({game.first_click} first click)")
+
+        def show_move(engine, move):
+            action = "reveal" if move.action == REVEAL else "flag"
+            print(f"{action} ({move.row}, {move.col}) -> {move.outcome} [{GameStatus(move.status).name}]")
+
+        engine, mismatches = replay_game(game, on_move=show_move)
+        for row in board_to_strings(engine.observation()):
+            print(" ".join(row))
+    else:
+        summary = replay_log(args.path, args.limit)
+        mismatches = summary["mismatches"]
+        print(f"Replayed {summary['games']} games ({summary['moves']} moves) in {summary['elapsed']:.2f}s: "
+              f"Wins={summary['wins']}, Losses={summary['losses']}, Unfinished={summary['unfinished']}")
+
+    for m in mismatches[:20]:
+        print(f"Mismatch in game {m.game} move {m.move}: recorded {m.expected}, replayed {m.actual}")
+    if mismatches:
+        raise SystemExit(1)
@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, asdict
+from multiprocessing import Pool
+
+import numpy as np
+from engine import MinesweeperEngine, WON
+from pattern_agent import PatternAgent
+from solver import ConstraintSolver
+
+
+@dataclass
+class SelfPlayConfig:
+    """Settings for a self-play run"""
+    workers: int = os.cpu_count() or 1
+    games_per_worker: int = 1000
+    time_budget: float = None  # Total wall-clock seconds, None for no limit
+    rows: int = 10
+    cols: int = 10
+    num_bombs: int = 15
+    seed: int = 0  # Worker i uses seed + i
+    policy: str = "random"  # One of POLICIES
+    agent_path: str = None  # Pattern table for the "agent" policy, as saved by PatternAgent.save()
+
+
+def random_policy(engine, rng):
+    """Pick a random unrevealed cell, like the original bots"""
+    hidden = np.flatnonzero(~engine.revealed)
+    return divmod(int(hidden[rng.randrange(len(hidden))]), engine.cols)
+
+
+class RandomPolicy:
+    """random_policy() behind the interface the workers use"""
+
+    def __init__(self, config, rng):
+        self.rng = rng
+
+    def reset(self):
+        pass
+
+    def choose(self, engine):
+        return random_policy(engine, self.rng)
+
+    def observe(self, engine, opened):
+        pass
+
+
+class SolverPolicy:
+    """ConstraintSolver moves, guessing the least likely mine when nothing is certain"""
+
+    def __init__(self, config, rng):
+        self.solver = ConstraintSolver(config.rows, config.cols, config.num_bombs, seed=rng.getrandbits(64))
+
+    def reset(self):
+        self.solver.reset()
+
+    def choose(self, engine):
+        r, c, _certain = self.solver.next_move()
+        return r, c
+
+    def observe(self, engine, opened):
+        self.solver.update(engine.observation(), changed=[tuple(cell) for cell in opened.tolist()])
+
+
+class AgentPolicy:
+    """A trained PatternAgent, without further learning"""
+
+    def __init__(self, config, rng):
+        if not config.agent_path:
+            raise ValueError("The agent policy needs agent_path")
+        self.agent = PatternAgent.load(config.agent_path, config.rows, config.cols, config.num_bombs,
+                                       seed=rng.getrandbits(64))
+
+    def reset(self):
+        self.agent.reset()
+
+    def choose(self, engine):
+        r, c, _ = self.agent.choose()
+        return r, c
+
+    def observe(self, engine, opened):
+        self.agent.observe(opened, engine.counts[opened[:, 0], opened[:, 1]])
+
+
+# Policies a self-play run can use, by SelfPlayConfig.policy
+POLICIES = {"random": RandomPolicy, "solver": SolverPolicy, "agent": AgentPolicy}
+
+
+def play_games(config, worker_id, deadline):
+    """Play games in one worker process and return its raw statistics"""
+    seed = config.seed + worker_id
+    rng = random.Random(seed)
+    engine = MinesweeperEngine(config.rows, config.cols, config.num_bombs, seed=rng.getrandbits(64))
+    policy = POLICIES[config.policy](config, rng)
+
+    stats = {"worker": worker_id, "seed": seed, "games": 0, "wins": 0,
+             "losses": 0, "moves": 0, "lengths": Counter()}
+    start = time.perf_counter()
+    for _ in range(config.games_per_worker):
+        if deadline is not None and time.time() >= deadline:
+            break
+        engine.reset(seed=rng.getrandbits(64))
+        policy.reset()
+        moves = 0
+        while not engine.game_over:
+            opened = engine.reveal(*policy.choose(engine))
+            moves += 1
+            if not engine.game_over:
+                policy.observe(engine, opened)
+
+        stats["games"] += 1
+        stats["moves"] += moves
+        stats["lengths"][moves] += 1
+        if engine.status == WON:
+            stats["wins"] += 1
+        else:
+            stats["losses"] += 1
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+def _play_games_star(args):
+    return play_games(*args)
+
+
+def merge_stats(worker_stats, wall_time):
+    """Combine per-worker statistics into a single report"""
+    lengths = Counter()
+    for stats in worker_stats:
+        lengths.update(stats["lengths"])
+    games = sum(s["games"] for s in worker_stats)
+    wins = sum(s["wins"] for s in worker_stats)
+    moves = sum(s["moves"] for s in worker_stats)
+
+    report = {
+        "games": games,
+        "wins": wins,
+        "losses": sum(s["losses"] for s in worker_stats),
+        "win_rate": wins / games if games else 0.0,
+        "moves": moves,
+        "wall_time": wall_time,
+        "games_per_sec": games / wall_time if wall_time > 0 else 0.0,
+        "moves_per_sec": moves / wall_time if wall_time > 0 else 0.0,
+        "game_length": {},
+        "workers": [],
+    }
+    if games:
+        ordered = sorted(lengths.elements())
+        report["game_length"] = {
+            "mean": moves / games,
+            "median": ordered[len(ordered) // 2],
+            "min": ordered[0],
+            "max": ordered[-1],
+        }
+    for stats in worker_stats:
+        report["workers"].append({
+            "worker": stats["worker"],
+            "seed": stats["seed"],
+            "games": stats["games"],
+            "wins": stats["wins"],
+            "losses": stats["losses"],
+            "games_per_sec": stats["games"] / stats["elapsed"] if stats["elapsed"] > 0 else 0.0,
+        })
+    return report
+
+
+def run_self_play(config=None):
+    """Spread games across a process pool and return the merged report"""
+    config = config or SelfPlayConfig()
+    if config.policy not in POLICIES:
+        raise ValueError(f"Unknown policy {config.policy!r}, expected one of {tuple(POLICIES)}")
+    start = time.perf_counter()
+    deadline = time.time() + config.time_budget if config.time_budget else None
+
+    jobs = [(config, worker_id, deadline) for worker_id in range(config.workers)]
+    with Pool(config.workers) as pool:
+        worker_stats = pool.map(_play_games_star, jobs)
+
+    report = merge_stats(worker_stats, time.perf_counter() - start)
+    report["config"] = asdict(config)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run headless self-play games in parallel")
+    parser.add_argument("--workers", type=int, default=SelfPlayConfig.workers)
+    parser.add_argument("--games-per-worker", type=int, default=SelfPlayConfig.games_per_worker)
+    parser.add_argument("--time-budget", type=float, default=None, help="Wall-clock limit in seconds")
+    parser.add_argument("--rows", type=int, default=SelfPlayConfig.rows)
+    parser.add_argument("--cols", type=int, default=SelfPlayConfig.cols)
+    parser.add_argument("--bombs", type=int, default=SelfPlayConfig.num_bombs)
+    parser.add_argument("--seed", type=int, default=SelfPlayConfig.seed)
+    parser.add_argument("--policy", choices=tuple(POLICIES), default=SelfPlayConfig.policy,
+                        help="Which bot plays the games")
+    parser.add_argument("--agent", dest="agent_path", help="Pattern table for --policy agent")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    config = SelfPlayConfig(
+        workers=args.workers,
+        games_per_worker=args.games_per_worker,
+        time_budget=args.time_budget,
+        rows=args.rows,
+        cols=args.cols,
+        num_bombs=args.bombs,
+        seed=args.seed,
+        policy=args.policy,
+        agent_path=args.agent_path,
+    )
+    report = run_self_play(config)
+    print(f"Stats: Games={report['games']}, Wins={report['wins']}, Losses={report['losses']}")
+    print(f"Throughput: {report['games_per_sec']:.0f} games/s, {report['moves_per_sec']:.0f} moves/s "
+          f"over {config.workers} workers")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.output}")
@@ -0,0 +1,168 @@
+import random
+import numpy as np
+from engine import UNREVEALED
+from probability import FrontierProbabilities
+
+
+class ConstraintSolver:
+    """Incremental constraint-propagation Minesweeper solver.
+
+    Every revealed number is a constraint: its unknown neighbours contain
+    exactly `remaining` mines. The single-cell rule (remaining is 0 or equals
+    the number of unknowns) and the subset rule (one constraint's unknowns
+    contained in another's) are applied until nothing changes. Only the
+    constraints touching newly revealed or newly deduced cells are revisited,
+    so the work per move depends on what changed, not on the board size.
+    """
+
+    def __init__(self, rows, cols, num_bombs=None, seed=None):
+        self.rows = rows
+        self.cols = cols
+        self.num_bombs = num_bombs
+        self.rng = random.Random(seed)
+        self.frontier = FrontierProbabilities()
+        self.reset()
+
+    def reset(self):
+        """Forget everything about the previous game"""
+        self.board = np.full((self.rows, self.cols), UNREVEALED, dtype=np.uint8)
+        self.constraints = {}  # revealed cell -> [set of unknown cells, remaining mines]
+        self.cell_constraints = {}  # unknown cell -> set of revealed cells constraining it
+        self.safe = set()  # unrevealed cells that are certainly safe
+        self.mines = set()  # cells that are certainly mines
+        self.unknown_count = self.rows * self.cols
+        self.frontier.reset()
+
+    def neighbours(self, r, c):
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                nr, nc = r + dr, c + dc
+                if (dr or dc) and 0 <= nr < self.rows and 0 <= nc < self.cols:
+                    yield nr, nc
+
+    def update(self, board, changed=None):
+        """Feed in the latest board codes and propagate the consequences.
+
+        `changed` may list the (row, col) cells that differ from the previous
+        board; when omitted it is found by comparing the two arrays.
+        """
+        board = np.asarray(board, dtype=np.uint8)
+        if changed is None:
+            changed = [tuple(cell) for cell in np.argwhere(board != self.board).tolist()]
+        self.board = board.copy()
+        self.unknown_count = int(np.count_nonzero(board >= UNREVEALED))
+
+        worklist = set()
+        for cell in changed:
+            if board[cell] >= UNREVEALED:
+                continue  # Flag toggles don't change what we know
+            self.safe.discard(cell)
+            self._resolve(cell, 0, worklist)
+            self._add_constraint(cell, int(board[cell]), worklist)
+        self._propagate(worklist)
+
+    def _add_constraint(self, cell, count, worklist):
+        unknowns = set()
+        remaining = count
+        for n in self.neighbours(*cell):
+            if n in self.mines:
+                remaining -= 1
+            elif self.board[n] >= UNREVEALED and n not in self.safe:
+                unknowns.add(n)
+        if not unknowns:
+            return
+        self.constraints[cell] = [unknowns, remaining]
+        for n in unknowns:
+            self.cell_constraints.setdefault(n, set()).add(cell)
+        worklist.add(cell)
+
+    def _resolve(self, cell, is_mine, worklist):
+        """Remove a cell whose value is now known from every constraint on it"""
+        for key in self.cell_constraints.pop(cell, ()):
+            constraint = self.constraints.get(key)
+            if constraint is None:
+                continue
+            constraint[0].discard(cell)
+            constraint[1] -= is_mine
+            worklist.add(key)
+
+    def _mark(self, cell, is_mine, worklist):
+        if cell in self.mines or cell in self.safe or self.board[cell] < UNREVEALED:
+            return
+        if is_mine:
+            self.mines.add(cell)
+        else:
+            self.safe.add(cell)
+        self._resolve(cell, is_mine, worklist)
+
+    def _propagate(self, worklist):
+        while worklist:
+            key = worklist.pop()
+            constraint = self.constraints.get(key)
+            if constraint is None:
+                continue
+            unknowns, remaining = constraint
+            if not unknowns:
+                del self.constraints[key]
+                continue
+
+            # Single-cell rule
+            if remaining == 0 or remaining == len(unknowns):
+                is_mine = 1 if remaining else 0
+                for cell in list(unknowns):
+                    self._mark(cell, is_mine, worklist)
+                continue
+
+            # Subset rule against every constraint sharing a cell with this one
+            related = set()
+            for cell in unknowns:
+                related.update(self.cell_constraints.get(cell, ()))
+            related.discard(key)
+            for other_key in related:
+                other = self.constraints.get(other_key)
+                if other is None:
+                    continue
+                for small, big in ((constraint, other), (other, constraint)):
+                    if small[0] < big[0]:
+                        extra = big[0] - small[0]
+                        extra_mines = big[1] - small[1]
+                        if extra_mines == 0 or extra_mines == len(extra):
+                            for cell in extra:
+                                self._mark(cell, 1 if extra_mines else 0, worklist)
+
+    def safe_moves(self):
+        """All unrevealed cells that are certainly safe"""
+        return sorted(self.safe)
+
+    def mine_probabilities(self):
+        """Mine probability of every frontier cell and of the other unknown cells.
+
+        Returns ({cell: probability}, density) where density applies to every
+        unknown cell outside the frontier. Probabilities are exact over all
+        layouts consistent with the board and the mines left (see
+        probability.FrontierProbabilities).
+        """
+        constraints = list(self.constraints.values())
+        frontier = set()
+        for unknowns, _ in constraints:
+            frontier.update(unknowns)
+        interior = self.unknown_count - len(frontier) - len(self.mines) - len(self.safe)
+        mines_left = None if self.num_bombs is None else self.num_bombs - len(self.mines)
+        return self.frontier.compute(constraints, interior, mines_left)
+
+    def next_move(self):
+        """Return (row, col, certain) for the next cell to reveal"""
+        for cell in self.safe:
+            return cell[0], cell[1], True
+
+        probabilities, density = self.mine_probabilities()
+        best = min(probabilities.values(), default=1.0)
+        if density < best or not probabilities:
+            candidates = [tuple(cell) for cell in np.argwhere(self.board >= UNREVEALED).tolist()
+                          if tuple(cell) not in probabilities and tuple(cell) not in self.mines]
+            if candidates:
+                cell = self.rng.choice(candidates)
+                return cell[0], cell[1], False
+        candidates = [cell for cell, p in probabilities.items() if p == best]
+        cell = self.rng.choice(candidates)
+        return cell[0], cell[1], False
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from engine import MinesweeperEngine, PLAYING
+from layouts import (ANY, SAFE, OPENING, bombs_for_density, excluded_cells, free_cells,
+                     generate_layout, generate_layouts)
+
+
+@pytest.mark.parametrize("density", [0.0, 0.1, 0.5, 0.8, 1.0])
+def test_exact_mine_count_at_every_density(density):
+    rows, cols = 16, 30
+    num_bombs = bombs_for_density(rows, cols, density)
+    layouts = generate_layouts(200, rows, cols, num_bombs, rng=0)
+    assert layouts.shape == (200, rows, cols)
+    assert (layouts.sum(axis=(1, 2)) == num_bombs).all()
+
+
+def test_density_out_of_range():
+    with pytest.raises(ValueError):
+        bombs_for_density(10, 10, 1.5)
+
+
+@pytest.mark.parametrize("mode", [SAFE, OPENING])
+def test_first_click_cells_stay_free(mode):
+    rows, cols, count = 9, 9, 500
+    num_bombs = free_cells(rows, cols, mode)  # As full as the mode allows
+    rng = np.random.default_rng(1)
+    first_clicks = rng.integers(0, (rows, cols), (count, 2))
+    layouts = generate_layouts(count, rows, cols, num_bombs, first_clicks, mode, rng)
+    excluded = excluded_cells(rows, cols, first_clicks, mode).reshape(count, rows, cols)
+    assert not (layouts & excluded).any()
+    assert (layouts.sum(axis=(1, 2)) == num_bombs).all()
+
+
+def test_opening_excludes_the_neighbourhood():
+    excluded = excluded_cells(5, 5, [(0, 0), (2, 2)], OPENING).reshape(2, 5, 5)
+    assert excluded[0].sum() == 4 and excluded[0, :2, :2].all()
+    assert excluded[1].sum() == 9 and excluded[1, 1:4, 1:4].all()
+    assert not excluded_cells(5, 5, [(2, 2)], ANY).any()
+
+
+@pytest.mark.parametrize("mode, first_click, num_bombs", [
+    (ANY, None, 10),
+    (SAFE, (1, 1), 9),
+    (OPENING, (1, 1), 1),
+])
+def test_over_full_board_raises(mode, first_click, num_bombs):
+    with pytest.raises(ValueError):
+        generate_layouts(1, 3, 3, num_bombs, first_click, mode)
+
+
+def test_first_click_mode_needs_the_click():
+    with pytest.raises(ValueError):
+        generate_layouts(1, 5, 5, 3, mode=SAFE)
+
+
+def test_placement_is_uniform():
+    # Every free cell should hold a mine in num_bombs / free of the layouts
+    rows, cols, num_bombs, count = 4, 4, 5, 40000
+    layouts = generate_layouts(count, rows, cols, num_bombs, (0, 0), OPENING, rng=2)
+    free = ~excluded_cells(rows, cols, [(0, 0)], OPENING).reshape(rows, cols)
+    frequency = layouts.mean(axis=0)
+    expected = num_bombs / free.sum()
+    # About five standard errors of a binomial proportion
+    tolerance = 5 * np.sqrt(expected * (1 - expected) / count)
+    assert np.abs(frequency[free] - expected).max() < tolerance
+    assert (frequency[~free] == 0).all()
+
+
+def test_same_seed_same_layout():
+    first = generate_layout(16, 30, 99, (5, 5), OPENING, rng=123)
+    second = generate_layout(16, 30, 99, (5, 5), OPENING, rng=123)
+    assert (first == second).all()
+
+
+@pytest.mark.parametrize("mode", [SAFE, OPENING])
+def test_engine_first_click_is_safe(mode):
+    for seed in range(50):
+        engine = MinesweeperEngine(9, 9, free_cells(9, 9, mode), seed=seed, first_click=mode)
+        engine.reveal(4, 4)
+        assert engine.mines.sum() == engine.num_bombs
+        assert not engine.mines[4, 4]
+        if mode == OPENING:
+            assert not engine.mines[3:6, 3:6].any()
+            assert engine.status != PLAYING or engine.revealed_cells > 1
+
+
+def test_engine_rejects_over_full_board_up_front():
+    with pytest.raises(ValueError):
+        MinesweeperEngine(3, 3, 5, first_click=OPENING)
+    engine = MinesweeperEngine(3, 3, 8, first_click=SAFE)
+    with pytest.raises(ValueError):
+        engine.num_bombs = 9
+        engine.reset()
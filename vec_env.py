@@ -0,0 +1,97 @@
+import numpy as np
+from engine import adjacent_counts, UNREVEALED
+from layouts import generate_layouts
+
+# Rewards returned by BatchedMinesweeperEnv.step
+REWARD_WIN = 1.0
+REWARD_LOSS = -1.0
+REWARD_PROGRESS = 0.1
+REWARD_NO_OP = -0.1  # Clicking a cell that is already revealed
+
+
+class BatchedMinesweeperEnv:
+    """Step N independent Minesweeper boards at once with array operations.
+
+    Boards are stored as stacked (N, rows, cols) uint8 arrays. Each call to
+    step() takes one flat cell index per board and returns observations,
+    rewards and done flags as arrays. Finished boards are reset in place, so
+    the observation returned for a done board is already the new game.
+    """
+
+    def __init__(self, num_envs, rows=10, cols=10, num_bombs=15, seed=None):
+        self.num_envs = num_envs
+        self.rows = rows
+        self.cols = cols
+        self.num_bombs = num_bombs
+        self.rng = np.random.default_rng(seed)
+
+        shape = (num_envs, rows, cols)
+        self.mines = np.zeros(shape, dtype=np.uint8)
+        self.counts = np.zeros(shape, dtype=np.uint8)
+        self.revealed = np.zeros(shape, dtype=np.uint8)
+        self.reset()
+
+    def reset(self, env_ids=None):
+        """Deal new boards for the given environments (all of them by default)"""
+        if env_ids is None:
+            env_ids = np.arange(self.num_envs)
+        env_ids = np.asarray(env_ids)
+        if env_ids.size == 0:
+            return self.observation()
+
+        mines = generate_layouts(env_ids.size, self.rows, self.cols, self.num_bombs, rng=self.rng)
+        self.mines[env_ids] = mines
+        self.counts[env_ids] = adjacent_counts(mines)
+        self.revealed[env_ids] = 0
+        return self.observation()
+
+    def observation(self):
+        """(N, rows, cols) uint8 boards: counts where revealed, UNREVEALED elsewhere"""
+        return np.where(self.revealed == 1, self.counts, UNREVEALED).astype(np.uint8)
+
+    def step(self, actions):
+        """Apply one flat cell index per board.
+
+        Returns (observations, rewards, dones) where rewards is float32 and
+        dones is bool, both of shape (N,).
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        env_ids = np.arange(self.num_envs)
+        r, c = np.divmod(actions, self.cols)
+
+        already = self.revealed[env_ids, r, c] == 1
+        hit_mine = (self.mines[env_ids, r, c] == 1) & ~already
+        safe = ~already & ~hit_mine
+
+        self.revealed[env_ids[safe], r[safe], c[safe]] = 1
+
+        # Open zero regions only on the boards whose click landed on a zero
+        opening = safe & (self.counts[env_ids, r, c] == 0)
+        if opening.any():
+            self._flood_fill(env_ids[opening])
+
+        won = safe & (self.revealed.sum(axis=(1, 2)) == self.rows * self.cols - self.num_bombs)
+        dones = hit_mine | won
+
+        rewards = np.full(self.num_envs, REWARD_PROGRESS, dtype=np.float32)
+        rewards[already] = REWARD_NO_OP
+        rewards[hit_mine] = REWARD_LOSS
+        rewards[won] = REWARD_WIN
+
+        if dones.any():
+            self.reset(env_ids[dones])
+        return self.observation(), rewards, dones
+
+    def _flood_fill(self, env_ids):
+        """Grow revealed zero regions until no board changes"""
+        revealed = self.revealed[env_ids]
+        zeros = self.counts[env_ids] == 0
+        safe = self.mines[env_ids] == 0
+        while True:
+            # Every neighbour of a revealed zero cell is safe to reveal
+            grown = adjacent_counts(revealed & zeros) > 0
+            grown = (grown & safe).astype(np.uint8) | revealed
+            if np.array_equal(grown, revealed):
+                break
+            revealed = grown
+        self.revealed[env_ids] = revealed